@@ -1,22 +1,60 @@
-from flask import Flask, render_template, jsonify, request, redirect
+from flask import Flask, Response, render_template, jsonify, request, redirect
+import atexit
 import json
+import mmap
 import os
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
 import threading
 import time
 import random
 from collections import deque, Counter
-import requests
+import urllib3
 import sqlite3
 import re
 import queue
+import bisect
+import heapq
+import itertools
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
 try:
 	import psutil  # optional, for realistic cpu/memory
 except Exception:
 	psutil = None
+try:
+	import orjson  # optional, faster JSON encoding
+except Exception:
+	orjson = None
+from flask.json.provider import DefaultJSONProvider
+
+
+class _OrjsonProvider(DefaultJSONProvider):
+	"""Encode responses with orjson when it is installed"""
+	def dumps(self, obj, **kwargs):
+		if orjson is None:
+			return super().dumps(obj, **kwargs)
+		return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+	def loads(self, s, **kwargs):
+		if orjson is None:
+			return super().loads(s, **kwargs)
+		return orjson.loads(s)
 
 
 app = Flask(__name__)
+app.json = _OrjsonProvider(app)
+
+# Keep-alive connection pool for REST backend forwarding
+_HTTP = urllib3.PoolManager(num_pools=4, maxsize=16)
+
+
+def _proxy_response(url):
+	"""GET url and pass the upstream JSON body through without decoding and re-encoding it"""
+	res = _HTTP.request('GET', url, timeout=3.0)
+	if res.status >= 400:
+		raise urllib3.exceptions.HTTPError(f"{url} returned {res.status}")
+	return Response(res.data, mimetype='application/json')
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -27,20 +65,44 @@ LOG_FILE = os.path.join(QUERY_LOG_DIR, "query_log.txt")
 STATUS_FILE = os.path.join(QUERY_LOG_DIR, "generator_status.txt")
 
 
+# Parsed JSON files keyed by path -> ((mtime_ns, size), data)
+_JSON_CACHE = {}
+
+
 def _read_json(filename, default):
 	path = os.path.join(DATA_DIR, filename)
 	try:
-		with open(path, 'r', encoding='utf-8') as f:
-			return json.load(f)
+		st = os.stat(path)
+		# size too, so a rewrite within the mtime granularity is still noticed
+		stamp = (st.st_mtime_ns, st.st_size)
+		hit = _JSON_CACHE.get(path)
+		if hit and hit[0] == stamp:
+			return hit[1]
+		with open(path, 'rb') as f:
+			raw = f.read()
+		data = orjson.loads(raw) if orjson else json.loads(raw)
+		_JSON_CACHE[path] = (stamp, data)
+		return data
 	except Exception:
 		return default
 
 
-def _write_json(filename, payload):
+def _dumps(payload):
+	"""Compact JSON bytes, via orjson when installed"""
+	if orjson:
+		return orjson.dumps(payload)
+	return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+def _write_json(filename, payload, data=None):
+	"""Atomically replace a data file; pass data to reuse already-encoded bytes"""
 	path = os.path.join(DATA_DIR, filename)
+	_JSON_CACHE.pop(path, None)
 	os.makedirs(DATA_DIR, exist_ok=True)
-	with open(path, 'w', encoding='utf-8') as f:
-		json.dump(payload, f, indent=2)
+	tmp = path + '.tmp'
+	with open(tmp, 'wb') as f:
+		f.write(data if data is not None else _dumps(payload))
+	os.replace(tmp, path)
 
 
 # ------------------------ GAURAV'S QUERY GENERATOR ------------------------
@@ -84,62 +146,85 @@ def init_gaurav_db():
 		column_name TEXT,
 		frequency INTEGER
 	);
+	CREATE UNIQUE INDEX IF NOT EXISTS idx_freq_unique
+	ON attribute_frequency(table_name, column_name);
+	-- lets auto_manage_indexes read its top/bottom rows without a sort
+	CREATE INDEX IF NOT EXISTS idx_freq_freq ON attribute_frequency(frequency);
 	""")
 	conn.commit()
 	conn.close()
 
-def rotate_focus():
-	"""Rotate column focus in a predictable cycle"""
+def rotate_focus_once():
+	"""Advance the column focus one step in its predictable cycle"""
 	global customer_cycle, order_cycle, current_focus
-	while True:
-		time.sleep(6)  # FOCUS_ROTATION_INTERVAL
-		customer_cycle = customer_cycle[1:] + customer_cycle[:1]
-		order_cycle = order_cycle[1:] + order_cycle[:1]
-		current_focus["customers"]["most"] = customer_cycle[0]
-		current_focus["customers"]["least"] = customer_cycle[-1]
-		current_focus["orders"]["most"] = order_cycle[0]
-		current_focus["orders"]["least"] = order_cycle[-1]
-
-def generate_gaurav_query():
-	"""Generate queries using Gaurav's logic"""
-	qtype = random.random();
-	table = random.choice(["customers", "orders"])
-	focus_col = current_focus[table]["most"] if random.random() < 0.7 else current_focus[table]["least"]
+	customer_cycle = customer_cycle[1:] + customer_cycle[:1]
+	order_cycle = order_cycle[1:] + order_cycle[:1]
+	current_focus["customers"]["most"] = customer_cycle[0]
+	current_focus["customers"]["least"] = customer_cycle[-1]
+	current_focus["orders"]["most"] = order_cycle[0]
+	current_focus["orders"]["least"] = order_cycle[-1]
+
+# Value pools and SQL text for generate_gaurav_query, built once
+_TABLES = ("customers", "orders")
+_CITIES = ("Delhi", "Mumbai", "Pune", "Kolkata")
+_STATUSES = ("Pending", "Shipped", "Delivered")
+_DELETE_VALUES = ("Delhi", "Mumbai", "Pending", "Delivered")
+_SELECT_CITIES = ("Delhi", "Pune", "Kolkata")
+_INSERT_SQL = {
+	"customers": "INSERT INTO customers (name, email, city, join_date) VALUES (?, ?, ?, ?)",
+	"orders": "INSERT INTO orders (customer_id, order_date, amount, status) VALUES (?, ?, ?, ?)"
+}
+_TABLE_COLS = (("customers", CUSTOMER_COLS), ("orders", ORDER_COLS))
+_UPDATE_SQL = {(t, c): f"UPDATE {t} SET {c} = ? WHERE id = ?" for t, cols in _TABLE_COLS for c in cols}
+_DELETE_SQL = {(t, c): f"DELETE FROM {t} WHERE {c} = ?" for t, cols in _TABLE_COLS for c in cols}
+_SELECT_SQL = {("customers", c): f"SELECT * FROM customers WHERE {c} = ?" for c in CUSTOMER_COLS}
+_SELECT_SQL.update({("orders", c): f"SELECT * FROM orders WHERE {c} > ? ORDER BY order_date DESC" for c in ORDER_COLS})
+# Columns each statement touches, so the frequency counter need not re-parse the SQL
+_INSERT_COLS = {
+	"customers": ("name", "email", "city", "join_date"),
+	"orders": ("customer_id", "order_date", "amount", "status")
+}
+_UPDATE_COLS = {(t, c): tuple(dict.fromkeys((c, "id"))) for t, cols in _TABLE_COLS for c in cols}
+_FOCUS_COLS = {(t, c): (c,) for t, cols in _TABLE_COLS for c in cols}
+_SELECT_COLS = {("customers", c): (c,) for c in CUSTOMER_COLS}
+_SELECT_COLS.update({("orders", c): tuple(dict.fromkeys((c, "order_date"))) for c in ORDER_COLS})
+_GQ_RNG = random.Random()
+
+def generate_gaurav_query(today=None):
+	"""Generate queries using Gaurav's logic; returns (sql, params, table, columns)"""
+	rand = _GQ_RNG.random
+	choice = _GQ_RNG.choice
+	qtype = rand()
+	table = choice(_TABLES)
+	focus = current_focus[table]
+	focus_col = focus["most"] if rand() < 0.7 else focus["least"]
 	
 	if qtype <= 0.25:
+		if today is None:
+			today = date.today().isoformat()
 		if table == "customers":
-			values = (f"User{random.randint(1,10000)}",
-					f"user{random.randint(1,10000)}@mail.com",
-					random.choice(["Delhi", "Mumbai", "Pune", "Kolkata"]),
-					datetime.now().strftime("%Y-%m-%d"))
-			sql = "INSERT INTO customers (name, email, city, join_date) VALUES (?, ?, ?, ?)"
-			params = values
+			params = (f"User{1 + int(rand() * 10000)}",
+					f"user{1 + int(rand() * 10000)}@mail.com",
+					choice(_CITIES),
+					today)
 		else:
-			values = (random.randint(1, 50),
-					datetime.now().strftime("%Y-%m-%d"),
-					round(random.uniform(500, 10000), 2),
-					random.choice(["Pending", "Shipped", "Delivered"]))
-			sql = "INSERT INTO orders (customer_id, order_date, amount, status) VALUES (?, ?, ?, ?)"
-			params = values
-		return sql, params
-	elif qtype <= 0.45:
-		value = f"Update{random.randint(100,999)}"
-		sql = f"UPDATE {table} SET {focus_col} = ? WHERE id = ?"
-		params = (value, random.randint(1, 50))
-		return sql, params
+			params = (1 + int(rand() * 50),
+					today,
+					round(500 + 9500 * rand(), 2),
+					choice(_STATUSES))
+		return _INSERT_SQL[table], params, table, _INSERT_COLS[table]
+	key = (table, focus_col)
+	if qtype <= 0.45:
+		params = (f"Update{100 + int(rand() * 900)}", 1 + int(rand() * 50))
+		return _UPDATE_SQL[key], params, table, _UPDATE_COLS[key]
 	elif qtype >= 0.95:
-		value = random.choice(["Delhi", "Mumbai", "Pending", "Delivered"])
-		sql = f"DELETE FROM {table} WHERE {focus_col} = ?"
-		params = (value,)
-		return sql, params
+		return _DELETE_SQL[key], (choice(_DELETE_VALUES),), table, _FOCUS_COLS[key]
 	else:  # SELECT
 		if table == "customers":
-			sql = f"SELECT * FROM customers WHERE {focus_col} = ?"
-			params = (random.choice(["Delhi", "Pune", "Kolkata"]),)
+			params = (choice(_SELECT_CITIES),)
 		else:
-			sql = f"SELECT * FROM orders WHERE {focus_col} > ? ORDER BY order_date DESC"
-			params = (random.randint(1000, 8000),)
-		return sql, params
+			params = (1000 + int(rand() * 7001),)
+		return _SELECT_SQL[key], params, table, _SELECT_COLS[key]
 
 # Column extraction patterns for frequency counter
 COLUMN_PATTERNS = [
@@ -150,195 +235,275 @@ COLUMN_PATTERNS = [
 	r"SET\s+(.*?)\s*(?:WHERE|;|$)",
 	r"INSERT\s+INTO\s+\w+\s*\((.*?)\)"
 ]
-TABLE_PATTERN = r"(?:FROM|INTO|UPDATE|JOIN)\s+([a-zA-Z_][a-zA-Z0-9_]*)"
-
+TABLE_PATTERN = re.compile(r"(?:FROM|INTO|UPDATE|JOIN)\s+([a-zA-Z_][a-zA-Z0-9_]*)", re.IGNORECASE)
+
+# extract_columns clause patterns, compiled once (case-insensitive, so no upper() copy)
+_INSERT_RE = re.compile(r"INSERT\s+INTO\s+\w+\s*\((.*?)\)", re.IGNORECASE)
+_UPDATE_RE = re.compile(r"UPDATE\s+\w+\s+SET\s+(.*?)(?:\s+WHERE|$)", re.IGNORECASE)
+_SELECT_RE = re.compile(r"SELECT\s+(.*?)\s+FROM", re.IGNORECASE)
+_WHERE_RE = re.compile(r"WHERE\s+(.*?)(?:\s+ORDER|\s+GROUP|\s+LIMIT|$)", re.IGNORECASE)
+_ORDER_RE = re.compile(r"ORDER\s+BY\s+(.*?)(?:\s+DESC|\s+ASC|\s+LIMIT|$)", re.IGNORECASE)
+# one pass per clause: quoted literals (skipped) and possibly qualified identifiers
+_TOKEN_RE = re.compile(r"'[^']*'|\"[^\"]*\"|[A-Za-z_][\w.]*")
+
+_SQL_STOPWORDS = frozenset({
+    "SELECT", "FROM", "WHERE", "AND", "OR", "AS", "ON", "IN",
+    "VALUES", "SET", "BY", "GROUP", "ORDER", "COUNT", "SUM",
+    "AVG", "MAX", "MIN", "DESC", "ASC"
+})
+# tokens are lowercased for the result anyway, so compare them lowercased
+_SQL_STOPWORDS_LOWER = frozenset(k.lower() for k in _SQL_STOPWORDS)
+
+def _clause_columns(clause, cols):
+    """Append the column names referenced in one clause to cols"""
+    for tok in _TOKEN_RE.findall(clause):
+        if tok[0] in "'\"":
+            continue
+        col = tok.rpartition(".")[2].lower()  # table.column -> column
+        if col and col not in _SQL_STOPWORDS_LOWER:
+            cols.append(col)
+
+@lru_cache(maxsize=512)
 def extract_columns(sql):
-    """Extract column names from SQL"""
+    """Extract column names from SQL (cached; the generator repeats a few templates)"""
     cols = []
-    sql_upper = sql.upper()
-    keywords = {
-        "SELECT", "FROM", "WHERE", "AND", "OR", "AS", "ON", "IN",
-        "VALUES", "SET", "BY", "GROUP", "ORDER", "COUNT", "SUM",
-        "AVG", "MAX", "MIN", "DESC", "ASC"
-    }
-
-    # Handle INSERT INTO table (col1, col2, ...) VALUES
-    insert_match = re.search(r"INSERT\s+INTO\s+\w+\s*\((.*?)\)", sql_upper, re.IGNORECASE)
-    if insert_match:
-        col_list = insert_match.group(1)
-        for col in re.split(r"[,\s]+", col_list):
-            col = col.strip()
-            if col and col.upper() not in keywords:
-                cols.append(col.lower())
-
-    # Handle UPDATE table SET col1 = ..., col2 = ...
-    update_match = re.search(r"UPDATE\s+\w+\s+SET\s+(.*?)(?:\s+WHERE|$)", sql_upper, re.IGNORECASE)
-    if update_match:
-        set_clause = update_match.group(1)
-        for col in re.split(r"[,\s=]+", set_clause):
-            col = col.strip()
-            if col and col.upper() not in keywords:
-                cols.append(col.lower())
-
-    # Handle SELECT col1, col2 FROM or SELECT * FROM
-    select_match = re.search(r"SELECT\s+(.*?)\s+FROM", sql_upper, re.IGNORECASE)
-    if select_match:
-        select_list = select_match.group(1)
-        if select_list.strip() != "*":
-            for col in re.split(r"[,\s]+", select_list):
-                col = col.strip().split(".")[-1]  # Handle table.column format
-                col = re.sub(r"\(.*?\)", "", col)  # Remove function calls
-                if col and col.upper() not in keywords:
-                    cols.append(col.lower())
-
-    # Handle WHERE clause columns
-    where_match = re.search(r"WHERE\s+(.*?)(?:\s+ORDER|\s+GROUP|\s+LIMIT|$)", sql_upper, re.IGNORECASE)
-    if where_match:
-        where_clause = where_match.group(1)
-        for col in re.split(r"[,\s=<>!]+", where_clause):
-            col = col.strip().split(".")[-1]
-            if col and col.upper() not in keywords:
-                cols.append(col.lower())
-
-    # Handle ORDER BY columns
-    order_match = re.search(r"ORDER\s+BY\s+(.*?)(?:\s+DESC|\s+ASC|\s+LIMIT|$)", sql_upper, re.IGNORECASE)
-    if order_match:
-        order_list = order_match.group(1)
-        for col in re.split(r"[,\s]+", order_list):
-            col = col.strip().split(".")[-1]
-            if col and col.upper() not in keywords:
-                cols.append(col.lower())
-
-    # Remove duplicates and filter
-    cols = list(set([c for c in cols if c and len(c) > 0 and not c.isdigit()]))
-    return cols
+    for clause_re in (_INSERT_RE, _UPDATE_RE, _SELECT_RE, _WHERE_RE, _ORDER_RE):
+        match = clause_re.search(sql)
+        if match:
+            _clause_columns(match.group(1), cols)
+
+    # Dedup (first-seen order); a tuple, since cached results are shared
+    return tuple(dict.fromkeys(cols))
 
+@lru_cache(maxsize=512)
 def extract_table(sql):
-	"""Extract table name from SQL"""
-	match = re.search(TABLE_PATTERN, sql, re.IGNORECASE)
+	"""Extract table name from SQL (cached; log readers see the same lines repeatedly)"""
+	match = TABLE_PATTERN.search(sql)
 	if match:
 		return match.group(1).lower()
 	return "unknown"
 
-def update_frequency_counter(sql):
-	"""Update frequency counter for columns in SQL"""
-	max_retries = 3
-	retry_delay = 0.1
-	
-	for attempt in range(max_retries):
+# "timestamp | sql | params" log lines: the sql's first 6 chars (lookahead, so the
+# table scan still sees an UPDATE verb) and its first FROM/INTO/UPDATE/JOIN table
+_LOG_STATS_RE = re.compile(
+	rb"^[^|\n]*\|[^\S\n]*(?=([^|\n]{0,6}))"
+	rb"(?:[^|\n]*?(?:FROM|INTO|UPDATE|JOIN)[^\S\n]+([A-Za-z_][A-Za-z0-9_]*))?"
+	rb"[^\n]*",  # rest of the line, so the next search starts at a line boundary
+	re.IGNORECASE | re.MULTILINE,
+)
+
+# Log lines queued by tick() and appended in batches by the log writer thread
+_LOG_QUEUE = queue.SimpleQueue()
+LOG_FLUSH_SEC = 1.0
+LOG_BATCH_MAX = 64
+
+# Heartbeat file memory-mapped and overwritten in place, at most once a second
+_STATUS_MM = None
+_STATUS_SEC = None
+
+def _touch_status(ts):
+	"""Write the heartbeat timestamp without reopening the status file"""
+	global _STATUS_MM, _STATUS_SEC
+	# readers allow a 10s timeout; per-tick writes would only add syscalls
+	sec = int(ts)
+	if sec == _STATUS_SEC:
+		return
+	_STATUS_SEC = sec
+	data = b"%.6f" % ts
+	if _STATUS_MM is None:
+		fd = os.open(STATUS_FILE, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
 		try:
-			table_name = extract_table(sql)
-			cols = extract_columns(sql)
-			if not cols or table_name == "unknown":
+			# fixed width, so each write fully covers the previous one
+			os.ftruncate(fd, len(data))
+			_STATUS_MM = mmap.mmap(fd, len(data))
+		finally:
+			os.close(fd)
+	_STATUS_MM[:len(data)] = data
+
+# Long-lived autocommit WAL connection for the frequency counter, opened on first use
+_FREQ_CONN = None
+_FREQ_LOCK = threading.Lock()
+# Increments coalesced per (table, column) and applied at most every FREQ_FLUSH_SEC
+_FREQ_PENDING = Counter()
+_FREQ_PENDING_SINCE = 0.0
+FREQ_FLUSH_SEC = 0.2
+
+def _freq_conn():
+	global _FREQ_CONN
+	if _FREQ_CONN is None:
+		conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None, timeout=10.0)
+		conn.execute("PRAGMA journal_mode=WAL;")
+		conn.execute("PRAGMA synchronous=NORMAL;")
+		_FREQ_CONN = conn
+	return _FREQ_CONN
+
+def update_frequency_counter(sql, table_name=None, cols=None):
+	"""Count columns in SQL (or the given table/columns); written by flush_frequency_counter"""
+	global _FREQ_PENDING_SINCE
+	if cols is None:
+		table_name = extract_table(sql)
+		cols = extract_columns(sql)
+	if not cols or table_name == "unknown":
+		return
+	with _FREQ_LOCK:
+		if not _FREQ_PENDING:
+			_FREQ_PENDING_SINCE = time.time()
+		for col in cols:
+			_FREQ_PENDING[(table_name, col)] += 1
+		due = time.time() - _FREQ_PENDING_SINCE >= FREQ_FLUSH_SEC
+	if due:
+		flush_frequency_counter()
+
+def flush_frequency_counter():
+	"""Apply the coalesced frequency increments in one transaction"""
+	global _FREQ_PENDING
+	try:
+		with _FREQ_LOCK:
+			if not _FREQ_PENDING:
 				return
-			
-			conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=5.0)
-			cur = conn.cursor()
-			
-			# Create unique constraint if not exists
+			pending, _FREQ_PENDING = _FREQ_PENDING, Counter()
+			conn = _freq_conn()
+			conn.execute("BEGIN IMMEDIATE")
 			try:
-				cur.execute("""
-					CREATE UNIQUE INDEX IF NOT EXISTS idx_freq_unique 
-					ON attribute_frequency(table_name, column_name)
-				""")
-			except:
-				pass
-			
-			for col in cols:
-				# Try to update existing, if not exists, insert
-				cur.execute("""
-					UPDATE attribute_frequency 
-					SET frequency = frequency + 1
-					WHERE table_name = ? AND column_name = ?
-				""", (table_name, col))
-				
-				if cur.rowcount == 0:
-					cur.execute("""
-						INSERT INTO attribute_frequency (table_name, column_name, frequency)
-						VALUES (?, ?, 1)
-					""", (table_name, col))
-			
-			conn.commit()
+				# one UPSERT per distinct column; relies on idx_freq_unique from init_gaurav_db
+				conn.executemany("""
+					INSERT INTO attribute_frequency (table_name, column_name, frequency)
+					VALUES (?, ?, ?)
+					ON CONFLICT(table_name, column_name) DO UPDATE SET frequency = frequency + excluded.frequency
+				""", [(table_name, col, n) for (table_name, col), n in pending.items()])
+				conn.execute("COMMIT")
+			except Exception:
+				conn.execute("ROLLBACK")
+				raise
+	except Exception:
+		pass
+
+atexit.register(flush_frequency_counter)
+
+# Long-lived read-only connections for the API, borrowed per request
+_READ_POOL = queue.Queue(maxsize=4)
+
+@contextmanager
+def _read_conn():
+	"""Borrow a pooled read-only connection, opening one if the pool is empty"""
+	try:
+		conn = _READ_POOL.get_nowait()
+	except queue.Empty:
+		conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None, timeout=5.0)
+		conn.execute("PRAGMA journal_mode=WAL;")
+		conn.execute("PRAGMA query_only=1;")
+	try:
+		yield conn
+	finally:
+		# never hand back a connection still holding a read snapshot
+		if conn.in_transaction:
+			conn.rollback()
+		try:
+			_READ_POOL.put_nowait(conn)
+		except queue.Full:
 			conn.close()
-			return  # Success, exit retry loop
-		except sqlite3.OperationalError as e:
-			if "locked" in str(e).lower() and attempt < max_retries - 1:
-				time.sleep(retry_delay * (attempt + 1))
-				continue
-			else:
-				pass
-		except Exception as e:
-			pass
+
+# Index names known to auto_manage_indexes, and the schema_version they match
+_EXISTING_INDEXES = None
+_SCHEMA_VERSION = None
 
 def auto_manage_indexes():
 	"""Gaurav's auto index management function"""
-	max_retries = 3
-	retry_delay = 0.1
-	
-	for attempt in range(max_retries):
-		try:
-			conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=5.0)
-			cur = conn.cursor()
-			
-			cur.execute("""
-				SELECT table_name, column_name, frequency
-				FROM attribute_frequency
-				ORDER BY frequency DESC
-			""")
-			all_cols = cur.fetchall()
-			
-			if len(all_cols) < 3:
-				conn.close()
-				return
-			
-			top_three = all_cols[:3]
-			bottom_six = all_cols[-6:]
-			
+	# timeout= is SQLite's own busy handler, so a locked database waits in C
+	conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=5.0)
+	try:
+		cur = conn.cursor()
+		
+		# only the rows we act on: the 3 most and 6 least used columns
+		cur.execute("""
+			SELECT table_name, column_name
+			FROM attribute_frequency
+			ORDER BY frequency DESC
+			LIMIT 3
+		""")
+		top_three = cur.fetchall()
+		
+		if len(top_three) < 3:
+			return
+		
+		cur.execute("""
+			SELECT table_name, column_name
+			FROM attribute_frequency
+			ORDER BY frequency ASC
+			LIMIT 6
+		""")
+		bottom_six = cur.fetchall()
+		
+		# index names are read once, then kept in step with our own CREATE/DROP;
+		# a schema_version we did not produce means someone else changed the schema
+		global _EXISTING_INDEXES, _SCHEMA_VERSION
+		schema_version = cur.execute("PRAGMA schema_version").fetchone()[0]
+		if _EXISTING_INDEXES is None or schema_version != _SCHEMA_VERSION:
 			cur.execute("SELECT name FROM sqlite_master WHERE type='index' AND name NOT LIKE 'sqlite_%';")
-			existing_indexes = {row[0] for row in cur.fetchall()}
-			
-			# Create indexes for top 3
-			for table_name, column_name, _ in top_three:
-				index_name = f"idx_{table_name}_{column_name}"
-				if index_name not in existing_indexes:
-					try:
-						cur.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({column_name});")
-					except Exception as e:
-						pass
-			
-			# Drop indexes for bottom 6
-			for table_name, column_name, _ in bottom_six:
-				index_name = f"idx_{table_name}_{column_name}"
-				if index_name in existing_indexes:
-					try:
-						cur.execute(f"DROP INDEX IF EXISTS {index_name};")
-					except Exception as e:
-						pass
-			
-			conn.commit()
-			conn.close()
-			return  # Success, exit retry loop
-		except sqlite3.OperationalError as e:
-			if "locked" in str(e).lower() and attempt < max_retries - 1:
-				time.sleep(retry_delay * (attempt + 1))
-				continue
-			else:
-				pass
-		except Exception as e:
-			pass
+			_EXISTING_INDEXES = {row[0] for row in cur.fetchall()}
+		existing_indexes = _EXISTING_INDEXES
+		
+		# Create indexes for top 3
+		for table_name, column_name in top_three:
+			index_name = f"idx_{table_name}_{column_name}"
+			if index_name not in existing_indexes:
+				try:
+					cur.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({column_name});")
+					existing_indexes.add(index_name)
+				except Exception as e:
+					pass
+		
+		# Drop indexes for bottom 6
+		for table_name, column_name in bottom_six:
+			index_name = f"idx_{table_name}_{column_name}"
+			if index_name in existing_indexes:
+				try:
+					cur.execute(f"DROP INDEX IF EXISTS {index_name};")
+					existing_indexes.discard(index_name)
+				except Exception as e:
+					pass
+		
+		conn.commit()
+		_SCHEMA_VERSION = cur.execute("PRAGMA schema_version").fetchone()[0]
+	except Exception as e:
+		pass
+	finally:
+		conn.close()
 
 # ------------------------ OLD QUERY GENERATOR (DEPRECATED) ------------------------
 
+@dataclass(slots=True, frozen=True)
+class ColumnDef:
+	"""One generated column; attribute reads instead of nested dict lookups"""
+	name: str
+	type: str
+	range: tuple = ()
+	values: tuple = ()
+	pattern: str = ""
+	length: tuple = ()
+	primary: bool = False
+	foreign: str | None = None
+	decimals: int = 2
+	true_probability: float = 0.5
+
+
 class QueryGenerator:
 	def __init__(self):
+		# Private RNG with its methods bound once
+		self._rng = random.Random()
+		self._choice = self._rng.choice
+		self._randint = self._rng.randint
+		self._uniform = self._rng.uniform
+		self._random = self._rng.random
+		
 		# Define table schemas with realistic column types and constraints
-		self.schemas = {
+		schemas = {
 			"users": {
 				"id": {"type": "int", "range": (1, 10000), "primary": True},
 				"name": {"type": "string", "pattern": "name", "length": (3, 25)},
 				"email": {"type": "string", "pattern": "email", "length": (10, 40)},
 				"age": {"type": "int", "range": (18, 80)},
-				"status": {"type": "enum", "values": ["active", "inactive", "pending", "suspended"]},
+				"status": {"type": "enum", "values": ("active", "inactive", "pending", "suspended")},
 				"created_at": {"type": "date", "range": ("2020-01-01", "2024-12-31")},
 				"is_premium": {"type": "boolean", "true_probability": 0.3}
 			},
@@ -347,7 +512,7 @@ class QueryGenerator:
 				"user_id": {"type": "int", "range": (1, 10000), "foreign": "users.id"},
 				"product_name": {"type": "string", "pattern": "product", "length": (5, 50)},
 				"amount": {"type": "float", "range": (10.0, 2000.0), "decimals": 2},
-				"status": {"type": "enum", "values": ["pending", "processing", "shipped", "delivered", "cancelled"]},
+				"status": {"type": "enum", "values": ("pending", "processing", "shipped", "delivered", "cancelled")},
 				"order_date": {"type": "date", "range": ("2023-01-01", "2024-12-31")},
 				"quantity": {"type": "int", "range": (1, 10)}
 			},
@@ -355,20 +520,25 @@ class QueryGenerator:
 				"id": {"type": "int", "range": (1, 75000), "primary": True},
 				"order_id": {"type": "int", "range": (1, 50000), "foreign": "orders.id"},
 				"amount": {"type": "float", "range": (10.0, 2000.0), "decimals": 2},
-				"payment_method": {"type": "enum", "values": ["credit_card", "debit_card", "paypal", "bank_transfer"]},
-				"status": {"type": "enum", "values": ["pending", "completed", "failed", "refunded"]},
+				"payment_method": {"type": "enum", "values": ("credit_card", "debit_card", "paypal", "bank_transfer")},
+				"status": {"type": "enum", "values": ("pending", "completed", "failed", "refunded")},
 				"transaction_date": {"type": "date", "range": ("2023-01-01", "2024-12-31")}
 			},
 			"audit_logs": {
 				"id": {"type": "int", "range": (1, 100000), "primary": True},
 				"user_id": {"type": "int", "range": (1, 10000), "foreign": "users.id"},
-				"action": {"type": "enum", "values": ["login", "logout", "create", "update", "delete", "view"]},
-				"table_name": {"type": "enum", "values": ["users", "orders", "payments", "audit_logs"]},
+				"action": {"type": "enum", "values": ("login", "logout", "create", "update", "delete", "view")},
+				"table_name": {"type": "enum", "values": ("users", "orders", "payments", "audit_logs")},
 				"created_at": {"type": "date", "range": ("2023-01-01", "2024-12-31")},
 				"ip_address": {"type": "string", "pattern": "ip", "length": (7, 15)}
 			}
 		}
 		
+		self.schemas = {
+			table_name: {col: ColumnDef(name=col, **defn) for col, defn in cols.items()}
+			for table_name, cols in schemas.items()
+		}
+		
 		# Sample data for string generation
 		self.name_samples = ["John", "Jane", "Mike", "Sarah", "David", "Lisa", "Chris", "Emma", "Alex", "Maria", "Tom", "Anna", "James", "Kate", "Ryan", "Sophie"]
 		self.product_samples = ["Laptop", "Phone", "Tablet", "Headphones", "Camera", "Watch", "Book", "Shoes", "Shirt", "Bag", "Mouse", "Keyboard", "Monitor", "Speaker", "Charger"]
@@ -376,57 +546,152 @@ class QueryGenerator:
 		
 		# Query distribution weights
 		self.query_weights = {"SELECT": 50, "INSERT": 20, "UPDATE": 20, "DELETE": 5}
+		# Cumulative weights for bisect sampling (random.choices rebuilds these every call)
+		self._qw_types = tuple(self.query_weights)
+		self._qw_cum = list(itertools.accumulate(self.query_weights.values()))
+		self._qw_total = self._qw_cum[-1]
+		self._table_names = tuple(self.schemas)
+		
+		# Column partitions per table, computed once instead of on every query
+		def cols_where(schema, pred):
+			return tuple(c.name for c in schema.values() if pred(c))
+		self._string_like_cols = {}
+		self._numeric_cols = {}
+		self._enum_cols = {}
+		self._date_cols = {}
+		self._updatable_cols = {}
+		self._int_enum_cols = {}
+		self._int_enum_date_cols = {}
+		for table_name, schema in self.schemas.items():
+			self._string_like_cols[table_name] = cols_where(schema, lambda c: c.type == "string" and c.pattern in ("name", "product"))
+			self._numeric_cols[table_name] = cols_where(schema, lambda c: c.type in ("int", "float"))
+			self._enum_cols[table_name] = cols_where(schema, lambda c: c.type == "enum")
+			self._date_cols[table_name] = cols_where(schema, lambda c: c.type == "date")
+			self._updatable_cols[table_name] = cols_where(schema, lambda c: not c.primary)
+			self._int_enum_cols[table_name] = cols_where(schema, lambda c: c.type in ("int", "enum"))
+			self._int_enum_date_cols[table_name] = cols_where(schema, lambda c: c.type in ("int", "enum", "date"))
+		
+		# Per-column value generators, resolved once so generation skips the type dispatch
+		self._generators = {
+			table_name: {col: self._make_generator(col_def) for col, col_def in schema.items()}
+			for table_name, schema in self.schemas.items()
+		}
+		
+		# INSERT column lists never change (primary keys are always skipped), so
+		# resolve their string and a per-column row plan up front
+		self._insert_cols_str = {}
+		self._row_plans = {}
+		for t, cols in self._updatable_cols.items():
+			self._insert_cols_str[t] = ", ".join(cols)
+			self._row_plans[t] = tuple(self._row_plan_entry(t, c) for c in cols)
+	
+	def _make_generator(self, column_def):
+		"""Build a zero-argument callable producing values for a column definition"""
+		col_type = column_def.type
+		randint = self._randint
+		
+		if col_type == "int":
+			lo, hi = column_def.range
+			return lambda: randint(lo, hi)
+		elif col_type == "float":
+			lo, hi = column_def.range
+			decimals = column_def.decimals
+			uniform = self._uniform
+			return lambda: round(uniform(lo, hi), decimals)
+		elif col_type == "string":
+			pattern, length = column_def.pattern, column_def.length
+			return lambda: self._generate_string(pattern, length)
+		elif col_type == "enum":
+			values = column_def.values
+			choice = self._choice
+			return lambda: choice(values)
+		elif col_type == "boolean":
+			p = column_def.true_probability
+			rand = self._random
+			return lambda: rand() < p
+		elif col_type == "date":
+			# parse the range once and pre-format every day in it (a few thousand strings)
+			start = datetime.strptime(column_def.range[0], "%Y-%m-%d")
+			days = (datetime.strptime(column_def.range[1], "%Y-%m-%d") - start).days
+			dates = tuple((start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days + 1))
+			choice = self._choice
+			return lambda: choice(dates)
+		else:
+			return lambda: "NULL"
+	
+	def _row_plan_entry(self, table_name, col):
+		"""(kind, params) used by _generate_row to produce a column's SQL literal"""
+		col_def = self.schemas[table_name][col]
+		col_type = col_def.type
+		if col_type == "int":
+			lo, hi = col_def.range
+			return ("int", (lo, hi - lo + 1))
+		if col_type == "float":
+			lo, hi = col_def.range
+			return ("float", (lo, hi - lo, col_def.decimals))
+		if col_type == "enum":
+			return ("choice", tuple(f"'{v}'" for v in col_def.values))
+		if col_type == "date":
+			# pre-quoted dates drawn from the column generator's pre-formatted days
+			start = datetime.strptime(col_def.range[0], "%Y-%m-%d")
+			days = (datetime.strptime(col_def.range[1], "%Y-%m-%d") - start).days
+			return ("choice", tuple(f"'{(start + timedelta(days=i)).strftime('%Y-%m-%d')}'" for i in range(days + 1)))
+		if col_type == "boolean":
+			return ("bool", col_def.true_probability)
+		if col_type == "string":
+			return ("string", self._generators[table_name][col])
+		return ("null", None)
+	
+	def _generate_row(self, table_name):
+		"""SQL literals for one INSERT row, produced in a single pass over the table's row plan"""
+		choice = self._choice
+		rand = self._random
+		row = []
+		append = row.append
+		# ints and floats are scaled from one random() draw each rather than randint/uniform
+		for kind, params in self._row_plans[table_name]:
+			if kind == "choice":
+				append(choice(params))
+			elif kind == "int":
+				lo, span = params
+				append(str(lo + int(rand() * span)))
+			elif kind == "float":
+				lo, span, decimals = params
+				append(str(round(lo + span * rand(), decimals)))
+			elif kind == "string":
+				append(f"'{params()}'")
+			elif kind == "bool":
+				append(str(rand() < params))
+			else:
+				append("NULL")
+		return row
 	
 	def _generate_string(self, pattern, length_range):
 		"""Generate realistic string data based on pattern"""
 		if pattern == "name":
-			return random.choice(self.name_samples) + " " + random.choice(self.name_samples)
+			return self._choice(self.name_samples) + " " + self._choice(self.name_samples)
 		elif pattern == "email":
-			name = random.choice(self.name_samples).lower()
-			domain = random.choice(self.email_domains)
-			return f"{name}{random.randint(1, 999)}@{domain}"
+			name = self._choice(self.name_samples).lower()
+			domain = self._choice(self.email_domains)
+			return f"{name}{self._randint(1, 999)}@{domain}"
 		elif pattern == "product":
-			base = random.choice(self.product_samples)
+			base = self._choice(self.product_samples)
 			variants = ["Pro", "Max", "Plus", "Standard", "Premium", "Basic", "Deluxe"]
-			return f"{base} {random.choice(variants)}"
+			return f"{base} {self._choice(variants)}"
 		elif pattern == "ip":
-			return f"{random.randint(1, 255)}.{random.randint(1, 255)}.{random.randint(1, 255)}.{random.randint(1, 255)}"
+			return f"{self._randint(1, 255)}.{self._randint(1, 255)}.{self._randint(1, 255)}.{self._randint(1, 255)}"
 		else:
 			# Generic string
 			chars = "abcdefghijklmnopqrstuvwxyz"
-			length = random.randint(length_range[0], length_range[1])
-			return ''.join(random.choice(chars) for _ in range(length))
+			length = self._randint(length_range[0], length_range[1])
+			return ''.join(self._choice(chars) for _ in range(length))
 	
-	def _generate_date(self, date_range):
-		"""Generate random date within range"""
-		start = datetime.strptime(date_range[0], "%Y-%m-%d")
-		end = datetime.strptime(date_range[1], "%Y-%m-%d")
-		delta = end - start
-		random_days = random.randint(0, delta.days)
-		return (start + timedelta(days=random_days)).strftime("%Y-%m-%d")
-	
-	def _generate_value(self, column_def):
-		"""Generate a single value based on column definition"""
-		col_type = column_def["type"]
-		
-		if col_type == "int":
-			return random.randint(column_def["range"][0], column_def["range"][1])
-		elif col_type == "float":
-			value = random.uniform(column_def["range"][0], column_def["range"][1])
-			return round(value, column_def.get("decimals", 2))
-		elif col_type == "string":
-			return self._generate_string(column_def["pattern"], column_def["length"])
-		elif col_type == "enum":
-			return random.choice(column_def["values"])
-		elif col_type == "boolean":
-			return random.random() < column_def.get("true_probability", 0.5)
-		elif col_type == "date":
-			return self._generate_date(column_def["range"])
-		else:
-			return "NULL"
+	def _generate_value(self, table_name, col):
+		"""Generate a single value for a table column"""
+		return self._generators[table_name][col]()
 	
 	def generate_select_query(self, table_name):
-		"""Generate realistic SELECT queries with various patterns"""
+		"""Generate realistic SELECT queries with various patterns; returns (sql, complexity)"""
 		schema = self.schemas[table_name]
 		patterns = [
 			"simple_select",      # SELECT * FROM table
@@ -438,152 +703,135 @@ class QueryGenerator:
 			"order_limit"         # SELECT * FROM table ORDER BY column LIMIT n
 		]
 		
-		pattern = random.choice(patterns)
+		pattern = self._choice(patterns)
 		
 		if pattern == "simple_select":
-			return f"SELECT * FROM {table_name} LIMIT {random.randint(10, 100)}"
+			return f"SELECT * FROM {table_name} LIMIT {self._randint(10, 100)}", "simple"
 		
 		elif pattern == "where_like":
-			string_cols = [col for col, defn in schema.items() if defn["type"] == "string" and defn.get("pattern") in ["name", "product"]]
+			string_cols = self._string_like_cols[table_name]
 			if string_cols:
-				col = random.choice(string_cols)
-				search_term = random.choice(self.name_samples if schema[col]["pattern"] == "name" else self.product_samples)
-				return f"SELECT * FROM {table_name} WHERE {col} LIKE '%{search_term}%' LIMIT {random.randint(5, 50)}"
+				col = self._choice(string_cols)
+				search_term = self._choice(self.name_samples if schema[col].pattern == "name" else self.product_samples)
+				return f"SELECT * FROM {table_name} WHERE {col} LIKE '%{search_term}%' LIMIT {self._randint(5, 50)}", "medium"
 			else:
-				return f"SELECT * FROM {table_name} LIMIT {random.randint(10, 100)}"
+				return f"SELECT * FROM {table_name} LIMIT {self._randint(10, 100)}", "simple"
 		
 		elif pattern == "where_range":
-			numeric_cols = [col for col, defn in schema.items() if defn["type"] in ["int", "float"]]
+			numeric_cols = self._numeric_cols[table_name]
 			if numeric_cols:
-				col = random.choice(numeric_cols)
-				col_def = schema[col]
-				start_val = self._generate_value(col_def)
-				end_val = self._generate_value(col_def)
+				col = self._choice(numeric_cols)
+				start_val = self._generate_value(table_name, col)
+				end_val = self._generate_value(table_name, col)
 				if start_val > end_val:
 					start_val, end_val = end_val, start_val
-				return f"SELECT * FROM {table_name} WHERE {col} BETWEEN {start_val} AND {end_val} LIMIT {random.randint(5, 50)}"
+				return f"SELECT * FROM {table_name} WHERE {col} BETWEEN {start_val} AND {end_val} LIMIT {self._randint(5, 50)}", "medium"
 			else:
-				return f"SELECT * FROM {table_name} LIMIT {random.randint(10, 100)}"
+				return f"SELECT * FROM {table_name} LIMIT {self._randint(10, 100)}", "simple"
 		
 		elif pattern == "where_enum":
-			enum_cols = [col for col, defn in schema.items() if defn["type"] == "enum"]
+			enum_cols = self._enum_cols[table_name]
 			if enum_cols:
-				col = random.choice(enum_cols)
-				value = random.choice(schema[col]["values"])
-				return f"SELECT * FROM {table_name} WHERE {col} = '{value}' LIMIT {random.randint(5, 50)}"
+				col = self._choice(enum_cols)
+				value = self._choice(schema[col].values)
+				return f"SELECT * FROM {table_name} WHERE {col} = '{value}' LIMIT {self._randint(5, 50)}", "medium"
 			else:
-				return f"SELECT * FROM {table_name} LIMIT {random.randint(10, 100)}"
+				return f"SELECT * FROM {table_name} LIMIT {self._randint(10, 100)}", "simple"
 		
 		elif pattern == "count_query":
-			enum_cols = [col for col, defn in schema.items() if defn["type"] == "enum"]
+			enum_cols = self._enum_cols[table_name]
 			if enum_cols:
-				col = random.choice(enum_cols)
-				value = random.choice(schema[col]["values"])
-				return f"SELECT COUNT(*) FROM {table_name} WHERE {col} = '{value}'"
+				col = self._choice(enum_cols)
+				value = self._choice(schema[col].values)
+				return f"SELECT COUNT(*) FROM {table_name} WHERE {col} = '{value}'", "simple"
 			else:
-				return f"SELECT COUNT(*) FROM {table_name}"
+				return f"SELECT COUNT(*) FROM {table_name}", "simple"
 		
 		elif pattern == "join_query":
 			# Simple join between related tables
 			if table_name == "orders" and "user_id" in schema:
-				return f"SELECT o.*, u.name FROM {table_name} o JOIN users u ON o.user_id = u.id LIMIT {random.randint(5, 30)}"
+				return f"SELECT o.*, u.name FROM {table_name} o JOIN users u ON o.user_id = u.id LIMIT {self._randint(5, 30)}", "complex"
 			elif table_name == "payments" and "order_id" in schema:
-				return f"SELECT p.*, o.product_name FROM {table_name} p JOIN orders o ON p.order_id = o.id LIMIT {random.randint(5, 30)}"
+				return f"SELECT p.*, o.product_name FROM {table_name} p JOIN orders o ON p.order_id = o.id LIMIT {self._randint(5, 30)}", "complex"
 			else:
-				return f"SELECT * FROM {table_name} LIMIT {random.randint(10, 100)}"
+				return f"SELECT * FROM {table_name} LIMIT {self._randint(10, 100)}", "simple"
 		
 		else:  # order_limit
-			date_cols = [col for col, defn in schema.items() if defn["type"] == "date"]
+			date_cols = self._date_cols[table_name]
 			if date_cols:
-				col = random.choice(date_cols)
-				return f"SELECT * FROM {table_name} ORDER BY {col} DESC LIMIT {random.randint(5, 50)}"
+				col = self._choice(date_cols)
+				return f"SELECT * FROM {table_name} ORDER BY {col} DESC LIMIT {self._randint(5, 50)}", "medium"
 			else:
-				return f"SELECT * FROM {table_name} LIMIT {random.randint(10, 100)}"
+				return f"SELECT * FROM {table_name} LIMIT {self._randint(10, 100)}", "simple"
 	
 	def generate_insert_query(self, table_name):
-		"""Generate realistic INSERT queries"""
-		schema = self.schemas[table_name]
-		columns = []
-		values = []
-		
-		for col_name, col_def in schema.items():
-			if col_def.get("primary"):  # Skip auto-generated primary keys
-				continue
-			columns.append(col_name)
-			values.append(self._generate_value(col_def))
-		
-		columns_str = ", ".join(columns)
-		values_str = ", ".join([f"'{v}'" if isinstance(v, str) else str(v) for v in values])
-		
-		return f"INSERT INTO {table_name} ({columns_str}) VALUES ({values_str})"
+		"""Generate realistic INSERT queries; returns (sql, complexity)"""
+		values = ', '.join(self._generate_row(table_name))
+		return f"INSERT INTO {table_name} ({self._insert_cols_str[table_name]}) VALUES ({values})", "simple"
 	
 	def generate_update_query(self, table_name):
-		"""Generate realistic UPDATE queries"""
-		schema = self.schemas[table_name]
-		
+		"""Generate realistic UPDATE queries; returns (sql, complexity)"""
 		# Choose a column to update (not primary key)
-		updatable_cols = [col for col, defn in schema.items() if not defn.get("primary")]
+		updatable_cols = self._updatable_cols[table_name]
 		if not updatable_cols:
-			return f"SELECT * FROM {table_name} LIMIT 1"  # Fallback
+			return f"SELECT * FROM {table_name} LIMIT 1", "simple"  # Fallback
 		
-		update_col = random.choice(updatable_cols)
-		new_value = self._generate_value(schema[update_col])
+		update_col = self._choice(updatable_cols)
+		new_value = self._generate_value(table_name, update_col)
 		
 		# Choose a condition column
-		condition_cols = [col for col, defn in schema.items() if defn["type"] in ["int", "enum"]]
+		condition_cols = self._int_enum_cols[table_name]
 		if not condition_cols:
-			return f"SELECT * FROM {table_name} LIMIT 1"  # Fallback
+			return f"SELECT * FROM {table_name} LIMIT 1", "simple"  # Fallback
 		
-		condition_col = random.choice(condition_cols)
-		condition_value = self._generate_value(schema[condition_col])
+		condition_col = self._choice(condition_cols)
+		condition_value = self._generate_value(table_name, condition_col)
 		
 		value_str = f"'{new_value}'" if isinstance(new_value, str) else str(new_value)
 		condition_str = f"'{condition_value}'" if isinstance(condition_value, str) else str(condition_value)
 		
-		return f"UPDATE {table_name} SET {update_col} = {value_str} WHERE {condition_col} = {condition_str}"
+		return f"UPDATE {table_name} SET {update_col} = {value_str} WHERE {condition_col} = {condition_str}", "medium"
 	
 	def generate_delete_query(self, table_name):
-		"""Generate realistic DELETE queries"""
-		schema = self.schemas[table_name]
-		
+		"""Generate realistic DELETE queries; returns (sql, complexity)"""
 		# Choose a condition column
-		condition_cols = [col for col, defn in schema.items() if defn["type"] in ["int", "enum", "date"]]
+		condition_cols = self._int_enum_date_cols[table_name]
 		if not condition_cols:
-			return f"SELECT * FROM {table_name} LIMIT 1"  # Fallback
+			return f"SELECT * FROM {table_name} LIMIT 1", "simple"  # Fallback
 		
-		condition_col = random.choice(condition_cols)
-		condition_value = self._generate_value(schema[condition_col])
+		condition_col = self._choice(condition_cols)
+		condition_value = self._generate_value(table_name, condition_col)
 		
 		condition_str = f"'{condition_value}'" if isinstance(condition_value, str) else str(condition_value)
 		
-		return f"DELETE FROM {table_name} WHERE {condition_col} = {condition_str}"
+		return f"DELETE FROM {table_name} WHERE {condition_col} = {condition_str}", "medium"
 	
 	def generate_query(self):
 		"""Generate a random query based on distribution weights"""
 		# Choose query type based on weights
-		query_types = list(self.query_weights.keys())
-		weights = list(self.query_weights.values())
-		query_type = random.choices(query_types, weights=weights)[0]
+		i = bisect.bisect(self._qw_cum, self._random() * self._qw_total)
+		query_type = self._qw_types[i]
 		
 		# Choose random table
-		table_name = random.choice(list(self.schemas.keys()))
+		table_name = self._choice(self._table_names)
 		
-		# Generate appropriate query
+		# Generate appropriate query; complexity comes from the pattern that built it
 		if query_type == "SELECT":
-			sql = self.generate_select_query(table_name)
+			sql, complexity = self.generate_select_query(table_name)
 		elif query_type == "INSERT":
-			sql = self.generate_insert_query(table_name)
+			sql, complexity = self.generate_insert_query(table_name)
 		elif query_type == "UPDATE":
-			sql = self.generate_update_query(table_name)
+			sql, complexity = self.generate_update_query(table_name)
 		elif query_type == "DELETE":
-			sql = self.generate_delete_query(table_name)
+			sql, complexity = self.generate_delete_query(table_name)
 		else:
-			sql = f"SELECT * FROM {table_name} LIMIT 10"
+			sql, complexity = f"SELECT * FROM {table_name} LIMIT 10", "simple"
 		
 		return {
 			"type": query_type,
 			"table": table_name,
-			"sql": sql
+			"sql": sql,
+			"complexity": complexity
 		}
 
 
@@ -601,143 +849,362 @@ class _RealtimeState:
 		self.mem = deque(maxlen=self.window)
 		self.storage = deque(maxlen=self.window)
 		self.storage_base = 221.0
+		# Private RNG for the simulated series, with its methods bound once
+		self._rng = random.Random()
+		self._randint = self._rng.randint
+		self._rand = self._rng.random
+		# psutil readings refreshed by _psutil_sampler, read by tick()
+		self._cpu_cache = None
+		self._mem_cache = None
+		# epoch second metrics.json was last rewritten in; /api/metrics encodes
+		# the live series itself, so the file only needs refreshing once a second
+		self._metrics_sec = None
+		self._tick_count = 0
+		# (epoch second, log timestamp, chart label) strings reused within a second
+		self._clock_strs = (None, "", "")
+		# (tick count, encoded metrics payload) reused by /api/metrics until the next tick
+		self._metrics_json = (-1, b"")
 		self.db_conn = None
+		# Generated writes queued across ticks and applied together by _flush_writes
+		self._pending_writes = deque()
+		self._last_write_flush = time.monotonic()
+		self.write_flush_every = 5
+		self.write_flush_sec = 2.0
+		# writes kept across failed flushes (e.g. while the database is locked)
+		self.write_backlog_max = 10000
 		self._init_db_connection()
 		self._seed()
+		# Running totals for /api/statistics, updated as queries are logged
+		self.query_types = Counter()
+		self.table_usage = Counter()
+		# Recent queries for /api/queries as (item, sql lowercased for search), newest last
+		self.queries_lower = deque(maxlen=200)
+		self._load_query_counters()
+	
+	def _load_query_counters(self):
+		"""Count the queries already in the log once at startup"""
+		try:
+			with open(LOG_FILE, "rb") as f:
+				buf = f.read()
+		except OSError:
+			return
+		# counted per distinct (verb, table) pair by one regex pass in C, then folded
+		for (verb, table), n in Counter(_LOG_STATS_RE.findall(buf)).items():
+			qtype = verb.decode("utf-8", errors="replace").upper()
+			if qtype not in ("SELECT", "INSERT", "UPDATE", "DELETE"):
+				qtype = "UNKNOWN"
+			self.query_types[qtype] += n
+			self.table_usage[table.decode("ascii").lower() if table else "unknown"] += n
+		# only the newest lines can end up in queries_lower: walk back that many
+		# newlines and decode just the slice after them, not the whole log
+		keep = self.queries_lower.maxlen
+		start = len(buf) - 1 if buf.endswith(b"\n") else len(buf)
+		for _ in range(keep):
+			start = buf.rfind(b"\n", 0, start)
+			if start < 0:
+				break
+		tail = buf[start + 1:].decode("utf-8", errors="replace").splitlines()[-keep:]
+		for line in tail:
+			parts = line.split("|")
+			if len(parts) >= 2:
+				self._remember_query(parts[0].strip(), parts[1].strip())
+	
+	def _count_query(self, timestamp, sql, table=None):
+		qtype, table = self._remember_query(timestamp, sql, table)
+		self.query_types[qtype] += 1
+		self.table_usage[table] += 1
+	
+	def _remember_query(self, timestamp, sql, table=None):
+		"""Add a query to queries_lower; returns its (type, table)"""
+		qtype = sql[:6].upper()
+		if qtype not in ("SELECT", "INSERT", "UPDATE", "DELETE"):
+			qtype = "UNKNOWN"
+		if table is None:
+			table = extract_table(sql)
+		item = {"timestamp": timestamp, "database": "app", "sql": sql, "type": qtype, "table": table}
+		self.queries_lower.append((item, sql.lower()))
+		return qtype, table
+	
+	def page_queries(self, search, start, page_size):
+		"""Page of recent queries (newest first) matching search, and the match count"""
+		with self.lock:
+			if search:
+				matches = [item for item, sql_lower in reversed(self.queries_lower) if search in sql_lower]
+			else:
+				matches = [item for item, _ in reversed(self.queries_lower)]
+		return [dict(q) for q in matches[start:start + page_size]], len(matches)
 	
+	def snapshot_statistics(self):
+		"""Copies of the query-type and table-usage totals"""
+		with self.lock:
+			return dict(self.query_types), dict(self.table_usage)
+	
+	def _connect(self):
+		# statement cache sized for every generator template, so each is prepared once
+		conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None, timeout=10.0, cached_statements=256)
+		conn.execute("PRAGMA cache_size=-8000;")
+		conn.execute("PRAGMA synchronous=NORMAL;")
+		conn.execute("PRAGMA temp_store=MEMORY;")
+		return conn
+
 	def _init_db_connection(self):
 		"""Initialize database connection for query execution"""
 		try:
-			self.db_conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=10.0)
+			self.db_conn = self._connect()
 			init_gaurav_db()
 		except Exception as e:
 			print(f"Error initializing DB: {e}")
 
+	def _flush_writes(self):
+		"""Apply queued writes in one transaction, one executemany per distinct statement"""
+		pending = self._pending_writes
+		self._last_write_flush = time.monotonic()
+		if not pending or not self.db_conn:
+			return
+		batch = []
+		grouped = {}
+		while pending:
+			sql, params = pending.popleft()
+			batch.append((sql, params))
+			grouped.setdefault(sql, []).append(params)
+		conn = self.db_conn
+		try:
+			conn.execute("BEGIN IMMEDIATE")
+			try:
+				for sql, rows in grouped.items():
+					conn.execute("SAVEPOINT write_batch")
+					try:
+						conn.executemany(sql, rows)
+					except sqlite3.Error:
+						# one bad row (e.g. text for an INTEGER PRIMARY KEY) must not
+						# cost the others: redo this statement's rows one at a time
+						conn.execute("ROLLBACK TO write_batch")
+						for row in rows:
+							try:
+								conn.execute(sql, row)
+							except sqlite3.Error:
+								pass
+					conn.execute("RELEASE write_batch")
+				conn.execute("COMMIT")
+			except Exception:
+				conn.execute("ROLLBACK")
+				raise
+		except sqlite3.Error as e:
+			# nothing was committed: put the batch back, in order, for the next flush
+			self._requeue_writes(batch)
+			# If locked, try to reconnect
+			if "locked" in str(e).lower():
+				try:
+					conn.close()
+				except:
+					pass
+				try:
+					self.db_conn = self._connect()
+				except:
+					pass
+		except Exception as e:
+			self._requeue_writes(batch)
+			print(f"Error flushing writes: {e}")
+
+	def _requeue_writes(self, batch):
+		"""Put a failed batch back at the front of the write queue, keeping it bounded"""
+		pending = self._pending_writes
+		pending.extendleft(reversed(batch))
+		overflow = len(pending) - self.write_backlog_max
+		if overflow > 0:
+			print(f"Write queue full, dropping the {overflow} oldest writes")
+			for _ in range(overflow):
+				pending.popleft()
+
 	def _seed(self):
-		for i in range(self.window):
-			self.labels.append(f"t-{self.window - i}")
-			base_qps = 150 + random.randint(-15, 15)
-			self.qps.append(base_qps)
-			self.latency.append(max(8, 35 - (base_qps - 120) * 0.08 + random.random() * 2))
-			self.cpu.append(min(95, max(5, (psutil.cpu_percent() if psutil else 35) + random.randint(-3, 3))))
-			self.mem.append(min(95, max(5, (psutil.virtual_memory().percent if psutil else 50) + random.randint(-1, 1))))
-			self.storage.append(self.storage_base + i * 0.02)
+		# sample psutil once for the whole window instead of once per point
+		n = self.window
+		cpu_base = psutil.cpu_percent(interval=None) if psutil else 35
+		mem_base = psutil.virtual_memory().percent if psutil else 50
+		# whole-window draws from one bound random(); int(r * k) - m is randint(-m, k - m - 1)
+		rand = self._rand
+		base_qps = [135 + int(rand() * 31) for _ in range(n)]
+		self.labels.extend(f"t-{n - i}" for i in range(n))
+		self.qps.extend(base_qps)
+		self.latency.extend(max(8, 35 - (q - 120) * 0.08 + rand() * 2) for q in base_qps)
+		self.cpu.extend(min(95, max(5, cpu_base - 3 + int(rand() * 7))) for _ in range(n))
+		self.mem.extend(min(95, max(5, mem_base - 1 + int(rand() * 3))) for _ in range(n))
+		self.storage.extend(self.storage_base + i * 0.02 for i in range(n))
 
 	def tick(self):
+		# one clock read per tick, shared by the label, log timestamp and metrics
+		now_utc = datetime.now(timezone.utc)
+		# strftime only when the second changes; many ticks share each second
+		sec = int(now_utc.timestamp())
+		if self._clock_strs[0] != sec:
+			self._clock_strs = (sec, now_utc.astimezone().strftime("%Y-%m-%d %H:%M:%S"), now_utc.strftime('%H:%M:%S'))
+		_, timestamp, label = self._clock_strs
+		# draw the random steps before taking the lock
+		randint = self._randint
+		rand = self._rand
+		qps_step = randint(-6, 6)
+		lat_jitter = rand() * 2
+		cpu_step = randint(-2, 3)
+		mem_step = randint(-1, 1)
+		stor_step = 0.00 if rand() < 0.6 else 0.02
 		with self.lock:
 			# metrics
 			last_qps = self.qps[-1] if self.qps else 150
-			qps_val = max(80, min(240, last_qps + random.randint(-6, 6)))
-			lat_val = max(6, 40 - (qps_val - 100) * 0.09 + random.random() * 2)
-			cpu_val = min(98, max(5, (psutil.cpu_percent() if psutil else (self.cpu[-1] if self.cpu else 40)) + random.randint(-2, 3)))
-			mem_val = min(98, max(5, (psutil.virtual_memory().percent if psutil else (self.mem[-1] if self.mem else 52)) + random.randint(-1, 1)))
-			stor_val = (self.storage[-1] if self.storage else self.storage_base) + (0.00 if random.random() < 0.6 else 0.02)
-			self.labels.append(datetime.now(timezone.utc).strftime('%H:%M:%S'))
+			qps_val = max(80, min(240, last_qps + qps_step))
+			lat_val = max(6, 40 - (qps_val - 100) * 0.09 + lat_jitter)
+			cpu_base = self._cpu_cache if self._cpu_cache is not None else (self.cpu[-1] if self.cpu else 40)
+			mem_base = self._mem_cache if self._mem_cache is not None else (self.mem[-1] if self.mem else 52)
+			cpu_val = min(98, max(5, cpu_base + cpu_step))
+			mem_val = min(98, max(5, mem_base + mem_step))
+			stor_val = (self.storage[-1] if self.storage else self.storage_base) + stor_step
+			self.labels.append(label)
 			self.qps.append(round(qps_val, 2))
 			self.latency.append(round(lat_val, 2))
 			self.cpu.append(round(cpu_val, 2))
 			self.mem.append(round(mem_val, 2))
 			self.storage.append(round(stor_val, 2))
-			# write out metrics.json for visibility
-			_write_json('metrics.json', {
-				"timestamp": datetime.now(timezone.utc).isoformat(),
-				"series": {
-					"labels": list(self.labels),
-					"qps": list(self.qps),
-					"latencyMs": list(self.latency),
-					"cpu": list(self.cpu),
-					"memory": list(self.mem),
-					"storageGb": list(self.storage)
-				}
-			})
-			# Generate query using Gaurav's generator
-			try:
-				sql, params = generate_gaurav_query()
-				timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-				
-				# Execute query in database
+			# snapshot for metrics.json (throttled); serialized after the lock is released
+			self._tick_count += 1
+			tick_count = self._tick_count
+			payload = None
+			if sec != self._metrics_sec:
+				self._metrics_sec = sec
+				payload = self._metrics_payload(now_utc)
+		if payload is not None:
+			data = _dumps(payload)
+			self._metrics_json = (tick_count, data)
+			_write_json('metrics.json', payload, data)
+		
+		# Generate query using Gaurav's generator
+		try:
+			sql, params, table, cols = generate_gaurav_query(timestamp[:10])
+			
+			# Reads run now; writes are queued and flushed in batches
+			if sql.startswith("SELECT"):
 				if self.db_conn:
 					try:
-						cur = self.db_conn.cursor()
-						cur.execute(sql, params or ())
-						self.db_conn.commit()
-					except sqlite3.OperationalError as e:
-						# If locked, try to reconnect
-						if "locked" in str(e).lower():
-							try:
-								self.db_conn.close()
-							except:
-								pass
-							try:
-								self.db_conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=10.0)
-							except:
-								pass
+						self.db_conn.execute(sql, params or ())
 					except Exception as e:
 						pass
-				
-				# Format SQL with params for display
-				formatted_sql = sql
-				if params:
-					# Replace ? placeholders with actual values (handle multiple ?)
-					parts = formatted_sql.split('?')
-					if len(parts) > 1:
-						result = []
-						for i, part in enumerate(parts):
-							result.append(part)
-							if i < len(params):
-								param = params[i]
-								if isinstance(param, str):
-									result.append(f"'{param}'")
-								else:
-									result.append(str(param))
-						formatted_sql = ''.join(result)
-				
-				# Update frequency counter
-				update_frequency_counter(formatted_sql)
-				
-				# Write to log file
-				log_entry = f"{timestamp} | {formatted_sql} | {params}\n"
-				with open(LOG_FILE, "a", encoding="utf-8") as f:
-					f.write(log_entry)
-				
-				# Update status file
-				with open(STATUS_FILE, "w") as f:
-					f.write(str(time.time()))
-			except Exception as e:
-				pass
+			else:
+				self._pending_writes.append((sql, params or ()))
+			if tick_count % self.write_flush_every == 0 or time.monotonic() - self._last_write_flush > self.write_flush_sec:
+				self._flush_writes()
+			
+			# Format SQL with params for display
+			formatted_sql = sql
+			if params:
+				# Replace ? placeholders with actual values (handle multiple ?)
+				parts = formatted_sql.split('?')
+				if len(parts) > 1:
+					result = []
+					for i, part in enumerate(parts):
+						result.append(part)
+						if i < len(params):
+							param = params[i]
+							if isinstance(param, str):
+								result.append(f"'{param}'")
+							else:
+								result.append(str(param))
+					formatted_sql = ''.join(result)
+			
+			# Update frequency counter
+			update_frequency_counter(formatted_sql, table, cols)
+			
+			# Queue for the log writer thread
+			_LOG_QUEUE.put(f"{timestamp} | {formatted_sql} | {params}\n")
+			with self.lock:
+				self._count_query(timestamp, formatted_sql, table)
+			
+			# Update status file
+			_touch_status(now_utc.timestamp())
+		except Exception as e:
+			pass
+
+	def _metrics_payload(self, now_utc):
+		return {
+			"timestamp": now_utc.isoformat(),
+			"series": {
+				"labels": list(self.labels),
+				"qps": list(self.qps),
+				"latencyMs": list(self.latency),
+				"cpu": list(self.cpu),
+				"memory": list(self.mem),
+				"storageGb": list(self.storage)
+			}
+		}
+
+	def snapshot_metrics_json(self):
+		"""Encoded metrics payload, encoded at most once per tick"""
+		with self.lock:
+			tick_count = self._tick_count
+			cached = self._metrics_json
+			if cached[0] == tick_count:
+				return cached[1]
+			payload = self._metrics_payload(datetime.now(timezone.utc))
+		data = _dumps(payload)
+		self._metrics_json = (tick_count, data)
+		return data
 
 
 STATE = _RealtimeState()
 
 
-def _start_simulator_thread():
+def _sample_system():
+	"""Sample CPU/memory into STATE"""
+	STATE._cpu_cache = psutil.cpu_percent(interval=None)
+	STATE._mem_cache = psutil.virtual_memory().percent
+
+def _start_scheduler_thread():
+	"""Run tick, the psutil sampler, index manager and focus rotation on one thread"""
+	# (first delay, interval, callback); FOCUS_ROTATION_INTERVAL is 6s
+	jobs = [(0.0, 0.001, STATE.tick), (10.0, 10.0, auto_manage_indexes), (6.0, 6.0, rotate_focus_once)]
+	if psutil is not None:
+		jobs.append((0.0, 1.0, _sample_system))
+	now = time.monotonic()
+	# min-heap of (next fire, seq, interval, callback); seq breaks ties
+	heap = [(now + delay, seq, interval, cb) for seq, (delay, interval, cb) in enumerate(jobs)]
+	heapq.heapify(heap)
 	def _loop():
 		while True:
+			when, seq, interval, cb = heap[0]
+			delay = when - time.monotonic()
+			if delay > 0:
+				time.sleep(delay)
+				continue
 			try:
-				STATE.tick()
+				cb()
 			except Exception:
 				pass
-			time.sleep(0.001)
+			# fixed rate, so a job's run time doesn't stretch its period; a job
+			# that fell behind runs again at once instead of bursting to catch up
+			heapq.heapreplace(heap, (max(when + interval, time.monotonic()), seq, interval, cb))
 	thr = threading.Thread(target=_loop, daemon=True)
 	thr.start()
 
-def _start_index_manager_thread():
-	"""Auto-manage indexes every 10 seconds"""
+def _start_log_writer_thread():
+	"""Append queued log lines in batches of up to LOG_BATCH_MAX, at least every LOG_FLUSH_SEC"""
 	def _loop():
-		while True:
-			try:
-				time.sleep(10)
-				auto_manage_indexes()
-			except Exception:
-				pass
+		with open(LOG_FILE, "a", buffering=8192, encoding="utf-8") as f:
+			while True:
+				batch = [_LOG_QUEUE.get()]
+				deadline = time.monotonic() + LOG_FLUSH_SEC
+				while len(batch) < LOG_BATCH_MAX:
+					remaining = deadline - time.monotonic()
+					if remaining <= 0:
+						break
+					try:
+						batch.append(_LOG_QUEUE.get(timeout=remaining))
+					except queue.Empty:
+						break
+				try:
+					f.writelines(batch)
+					f.flush()
+				except Exception:
+					pass
 	thr = threading.Thread(target=_loop, daemon=True)
 	thr.start()
 
-def _start_focus_rotation_thread():
-	"""Rotate column focus every 6 seconds"""
-	thr = threading.Thread(target=rotate_focus, daemon=True)
-	thr.start()
-
 
 @app.route('/')
 def index():
@@ -776,17 +1243,15 @@ def api_metrics():
 	settings = _read_json('settings.json', {"dataSource": "json", "backendBaseUrl": ""})
 	if settings.get('dataSource') == 'rest' and settings.get('backendBaseUrl'):
 		try:
-			res = requests.get(settings['backendBaseUrl'].rstrip('/') + '/metrics', timeout=3)
-			return jsonify(res.json())
+			return _proxy_response(settings['backendBaseUrl'].rstrip('/') + '/metrics')
 		except Exception:
 			pass
-	data = _read_json('metrics.json', {"timestamp": datetime.now(timezone.utc).isoformat(), "series": {"labels": [], "qps": [], "latencyMs": [], "cpu": [], "memory": [], "storageGb": []}})
-	return jsonify(data)
+	return Response(STATE.snapshot_metrics_json(), mimetype='application/json')
 
 
 @app.route('/api/queries')
 def api_queries():
-	"""Read queries from query_log.txt (last 20) or REST backend"""
+	"""Recent queries from the simulator's in-memory ring (last 200) or REST backend"""
 	settings = _read_json('settings.json', {"dataSource": "json", "backendBaseUrl": ""})
 	if settings.get('dataSource') == 'rest' and settings.get('backendBaseUrl'):
 		try:
@@ -794,65 +1259,21 @@ def api_queries():
 			page_size = int(request.args.get('pageSize', 20))
 			search = request.args.get('search', '').strip()
 			url = f"{settings['backendBaseUrl'].rstrip('/')}/queries?page={page}&pageSize={page_size}&search={search}"
-			res = requests.get(url, timeout=3)
-			return jsonify(res.json())
+			return _proxy_response(url)
 		except Exception:
 			pass
 	
 	try:
-		items = []
-		if os.path.exists(LOG_FILE):
-			with open(LOG_FILE, "r", encoding="utf-8") as f:
-				lines = f.readlines()
-				# Get last 20 lines
-				for line in lines[-20:]:
-					parts = line.strip().split("|")
-					if len(parts) >= 2:
-						timestamp = parts[0].strip()
-						sql = parts[1].strip()
-						params = parts[2].strip() if len(parts) > 2 else ""
-						
-						# Extract query type
-						sql_upper = sql.upper()
-						if sql_upper.startswith("SELECT"):
-							qtype = "SELECT"
-						elif sql_upper.startswith("INSERT"):
-							qtype = "INSERT"
-						elif sql_upper.startswith("UPDATE"):
-							qtype = "UPDATE"
-						elif sql_upper.startswith("DELETE"):
-							qtype = "DELETE"
-						else:
-							qtype = "UNKNOWN"
-						
-						# Extract table
-						table = extract_table(sql)
-						
-						items.append({
-							"timestamp": timestamp,
-							"latencyMs": round(max(5, random.gauss(20, 6)), 2),
-							"database": "app",
-							"sql": sql,
-							"type": qtype,
-							"table": table
-						})
-		
-		# Reverse to show newest first
-		items.reverse()
-		
-		# Apply search filter
+		# served from the in-memory ring kept by the simulator; no log file read
 		search = request.args.get('search', '').lower().strip()
-		if search:
-			items = [q for q in items if search in q.get('sql', '').lower()]
-		
-		# Pagination
 		page = int(request.args.get('page', 1))
 		page_size = int(request.args.get('pageSize', 20))
-		total = len(items)
 		start = (page - 1) * page_size
-		end = start + page_size
+		items, total = STATE.page_queries(search, start, page_size)
+		for q in items:
+			q["latencyMs"] = round(max(5, random.gauss(20, 6)), 2)
 		
-		return jsonify({"items": items[start:end], "total": total, "page": page, "pageSize": page_size})
+		return jsonify({"items": items, "total": total, "page": page, "pageSize": page_size})
 	except Exception as e:
 		return jsonify({"items": [], "total": 0, "page": 1, "pageSize": 20})
 
@@ -866,109 +1287,47 @@ def api_statistics():
 	settings = _read_json('settings.json', {"dataSource": "json", "backendBaseUrl": ""})
 	if settings.get('dataSource') == 'rest' and settings.get('backendBaseUrl'):
 		try:
-			res = requests.get(settings['backendBaseUrl'].rstrip('/') + '/statistics', timeout=3)
-			return jsonify(res.json())
+			return _proxy_response(settings['backendBaseUrl'].rstrip('/') + '/statistics')
 		except Exception:
 			pass
 	
 	try:
-		# Get column frequency from database
 		column_frequency = []
-		total_freq = 0
+		current_indexes = []
 		if os.path.exists(DB_PATH):
-			max_retries = 3
-			retry_delay = 0.1
-			for attempt in range(max_retries):
-				try:
-					conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=5.0)
-					cur = conn.cursor()
-					cur.execute("""
-						SELECT table_name, column_name, frequency
+			try:
+				# pooled read connection; one statement covers both lookups,
+				# rows tagged with their source in the first column
+				with _read_conn() as conn:
+					rows = conn.execute("""
+						SELECT 'freq', table_name, column_name, frequency,
+							COALESCE(ROUND(frequency * 100.0 / SUM(frequency) OVER (), 2), 0)
 						FROM attribute_frequency
-						ORDER BY frequency DESC
-					""")
-					rows = cur.fetchall()
-					for table_name, column_name, frequency in rows:
+						UNION ALL
+						SELECT 'index', tbl_name, name, NULL, sql
+						FROM sqlite_master
+						WHERE type='index' AND name NOT LIKE 'sqlite_%'
+						ORDER BY 1, 4 DESC
+					""").fetchall()
+				for kind, table_name, name, n, extra in rows:
+					if kind == "freq":
 						column_frequency.append({
 							"table": table_name,
-							"column": column_name,
-							"frequency": frequency
+							"column": name,
+							"frequency": n,
+							"percent": extra
 						})
-						total_freq += frequency
-					conn.close()
-					break  # Success, exit retry loop
-				except sqlite3.OperationalError as e:
-					if "locked" in str(e).lower() and attempt < max_retries - 1:
-						time.sleep(retry_delay * (attempt + 1))
-						continue
 					else:
-						break
-				except Exception as e:
-					break
-		
-		# Calculate percentages
-		for item in column_frequency:
-			item["percent"] = round((item["frequency"] / total_freq * 100), 2) if total_freq > 0 else 0
-		
-		# Get current indexes
-		current_indexes = []
-		if os.path.exists(DB_PATH):
-			max_retries = 3
-			retry_delay = 0.1
-			for attempt in range(max_retries):
-				try:
-					conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=5.0)
-					cur = conn.cursor()
-					cur.execute("""
-						SELECT name, tbl_name, sql
-						FROM sqlite_master
-						WHERE type='index' AND name NOT LIKE 'sqlite_%'
-					""")
-					for name, tbl_name, sql in cur.fetchall():
 						current_indexes.append({
 							"name": name,
-							"table": tbl_name,
-							"sql": sql
+							"table": table_name,
+							"sql": extra
 						})
-					conn.close()
-					break  # Success, exit retry loop
-				except sqlite3.OperationalError as e:
-					if "locked" in str(e).lower() and attempt < max_retries - 1:
-						time.sleep(retry_delay * (attempt + 1))
-						continue
-					else:
-						break
-				except Exception as e:
-					break
+			except sqlite3.Error:
+				pass
 		
-		# Read queries from log file for query type and table usage
-		query_types = {}
-		table_usage = {}
-		if os.path.exists(LOG_FILE):
-			with open(LOG_FILE, "r", encoding="utf-8") as f:
-				lines = f.readlines()
-				for line in lines:
-					parts = line.strip().split("|")
-					if len(parts) >= 2:
-						sql = parts[1].strip()
-						sql_upper = sql.upper()
-						
-						# Query type
-						if sql_upper.startswith("SELECT"):
-							qtype = "SELECT"
-						elif sql_upper.startswith("INSERT"):
-							qtype = "INSERT"
-						elif sql_upper.startswith("UPDATE"):
-							qtype = "UPDATE"
-						elif sql_upper.startswith("DELETE"):
-							qtype = "DELETE"
-						else:
-							qtype = "UNKNOWN"
-						query_types[qtype] = query_types.get(qtype, 0) + 1
-						
-						# Table usage
-						table = extract_table(sql)
-						table_usage[table] = table_usage.get(table, 0) + 1
+		# Query type and table usage totals kept by the simulator
+		query_types, table_usage = STATE.snapshot_statistics()
 		
 		return jsonify({
 			"query_types": query_types,
@@ -1011,14 +1370,14 @@ if __name__ == '__main__':
 	init_gaurav_db()
 	
 	# Start background threads
-	_start_simulator_thread()
-	_start_index_manager_thread()
-	_start_focus_rotation_thread()
+	_start_log_writer_thread()
+	_start_scheduler_thread()
 	
 	port = int(os.environ.get('PORT', 5000))
-	use_waitress = os.environ.get('USE_WAITRESS', '0') == '1'
+	# Waitress unless USE_WAITRESS=0; the fallback dev server never runs the debugger/reloader
+	use_waitress = os.environ.get('USE_WAITRESS', '1') != '0'
 	if use_waitress:
 		from waitress import serve
 		serve(app, host='0.0.0.0', port=port)
 	else:
-		app.run(host='0.0.0.0', port=port, debug=True)
+		app.run(host='0.0.0.0', port=port, debug=False, threaded=True)
@@ -4,11 +4,42 @@ import re
 import random
 import os
 import threading
+import queue
 from collections import Counter
-from concurrent.futures import ThreadPoolExecutor
 
 DB_NAME = "autoindex4.db"
 
+# "column =" in a WHERE clause, compiled once
+COL_RE = re.compile(r"\b(\w+)\s*=")
+
+# One connection per thread, reused for the thread's lifetime
+_TLS = threading.local()
+# Generated queries wait here for the single writer thread; SQLite serializes writers anyway
+_QUERY_QUEUE = queue.Queue(maxsize=1024)
+_WRITER_BATCH = 256
+
+def _thread_conn():
+    conn = getattr(_TLS, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_NAME, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        _TLS.conn = conn
+    return conn
+
+def _bump_column_usage(conn, queries):
+    """Add the WHERE columns of queries to column_usage (inside the caller's transaction)"""
+    counts = Counter()
+    for query in queries:
+        where = query.upper().find(" WHERE ")
+        if where != -1:
+            counts.update(COL_RE.findall(query, where + 7))
+    if counts:
+        conn.executemany("""
+            INSERT INTO column_usage (column_name, cnt) VALUES (?, ?)
+            ON CONFLICT(column_name) DO UPDATE SET cnt = cnt + excluded.cnt
+        """, counts.items())
+
 # Step 1: Create updated query log table
 def initialize_database():
     conn = sqlite3.connect(DB_NAME)
@@ -27,6 +58,17 @@ def initialize_database():
         age INTEGER
     )
     """)
+    # WHERE-column counts, kept up to date as queries are logged
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS column_usage (
+        column_name TEXT PRIMARY KEY,
+        cnt INTEGER
+    )
+    """)
+    # one-time backfill from a log written before column_usage existed
+    if cursor.execute("SELECT 1 FROM column_usage LIMIT 1").fetchone() is None:
+        logged = conn.execute("SELECT query FROM query_log_update2")
+        _bump_column_usage(conn, (query for (query,) in logged))
     conn.commit()
     conn.close()
     print("✅ Tables 'users' and 'query_log_update2' initialized.")
@@ -34,35 +76,44 @@ def initialize_database():
 # Step 2: Execute and log queries (thread-safe)
 def execute_and_log(query):
     try:
-        local_conn = sqlite3.connect(DB_NAME)
+        local_conn = _thread_conn()
         local_cursor = local_conn.cursor()
         local_cursor.execute(query)
         local_cursor.execute("INSERT INTO query_log_update2 (query) VALUES (?)", (query,))
+        _bump_column_usage(local_conn, (query,))
         local_conn.commit()
-        local_conn.close()
         print(f"[LOGGED] Executed and logged: {query}")
     except Exception as e:
         print(f"[ERROR] Query failed: {query}\nReason: {e}")
 
+def execute_batch(queries):
+    """Run queries and log every one that succeeded, all in one transaction"""
+    conn = _thread_conn()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        logged = []
+        for query in queries:
+            try:
+                conn.execute(query).fetchall()
+                logged.append(query)
+            except Exception as e:
+                print(f"[ERROR] Query failed: {query}\nReason: {e}")
+        conn.executemany("INSERT INTO query_log_update2 (query) VALUES (?)", [(q,) for q in logged])
+        _bump_column_usage(conn, logged)
+        conn.commit()
+        print(f"[LOGGED] Executed and logged {len(logged)} queries")
+    except Exception as e:
+        conn.rollback()
+        print(f"[ERROR] Batch failed\nReason: {e}")
+
 # Step 3: Analyze column usage
 def analyze_queries():
+    """WHERE-column usage counts, read from column_usage instead of rescanning the log"""
     conn = sqlite3.connect(DB_NAME)
     cursor = conn.cursor()
-    cursor.execute("SELECT query FROM query_log_update2")
-    queries = cursor.fetchall()
+    cursor.execute("SELECT column_name, cnt FROM column_usage")
+    column_counter = Counter(dict(cursor.fetchall()))
     conn.close()
-
-    column_counter = Counter()
-    where_pattern = re.compile(r"\bWHERE\b\s+(.*)", re.IGNORECASE)
-    column_pattern = re.compile(r"\b(\w+)\s*=")
-
-    for (query,) in queries:
-        where_match = where_pattern.search(query)
-        if where_match:
-            condition = where_match.group(1)
-            columns = column_pattern.findall(condition)
-            column_counter.update(columns)
-
     return column_counter
 
 # Step 4: Recommend indexes
@@ -118,11 +169,11 @@ def export_query_log(filename="query_log_update2.txt"):
     conn = sqlite3.connect(DB_NAME)
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM query_log_update2")
-    rows = cursor.fetchall()
-    conn.close()
+    # streamed straight from the cursor to the file
     with open(filename, "w") as f:
-        for row in rows:
+        for row in cursor:
             f.write(f"{row}\n")
+    conn.close()
     print(f"\n Query log exported to '{filename}'")
     print(f" File path: {os.path.abspath(filename)}")
 
@@ -149,14 +200,25 @@ def generate_query():
         name = random.choice(names)
         return f"DELETE FROM users WHERE name = '{name}'"
 
+def _writer_loop():
+    """Drain the query queue into batched transactions on one connection"""
+    while True:
+        batch = [_QUERY_QUEUE.get()]
+        while len(batch) < _WRITER_BATCH:
+            try:
+                batch.append(_QUERY_QUEUE.get_nowait())
+            except queue.Empty:
+                break
+        execute_batch(batch)
+
 # 🔁 Infinite query generator
 def run_parallel_queries_forever(batch_size=100, delay=0.5):
     print("\n🚀 Starting infinite query generation... Press Ctrl+C to stop.\n")
+    threading.Thread(target=_writer_loop, daemon=True).start()
     try:
         while True:
-            queries = [generate_query() for _ in range(batch_size)]
-            with ThreadPoolExecutor(max_workers=20) as executor:
-                executor.map(execute_and_log, queries)
+            for _ in range(batch_size):
+                _QUERY_QUEUE.put(generate_query())
             time.sleep(delay)
     except KeyboardInterrupt:
         print("\n🛑 Query generation stopped by user.")
@@ -7,9 +7,12 @@ from flask import Flask, jsonify, request
 from flask_cors import CORS
 import json
 import os
+import queue
 from datetime import datetime, timezone
 import random
+import re
 import sqlite3
+from contextlib import contextmanager
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for cross-origin requests
@@ -20,15 +23,76 @@ DATA_DIR = os.path.join(BASE_DIR, 'data')
 DB_PATH = os.path.join(BASE_DIR, "auto_index.db")
 LOG_FILE = os.path.join(BASE_DIR, "query_log.txt")
 
+# Query type keyed by the first six characters of the SQL (every verb is six long)
+QUERY_TYPES = {"SELECT": "SELECT", "INSERT": "INSERT", "UPDATE": "UPDATE", "DELETE": "DELETE"}
+
+# Long-lived read-only connections, reused across requests
+_conn_pool = queue.Queue(maxsize=4)
+
+@contextmanager
+def get_conn():
+    """Borrow a pooled read-only connection, opening one if the pool is empty"""
+    try:
+        conn = _conn_pool.get_nowait()
+    except queue.Empty:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA query_only=1")
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            _conn_pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+# Parsed JSON files keyed by path -> ((mtime_ns, size), data)
+_json_cache = {}
+
 def read_json(filename, default):
-    """Read JSON file from data directory"""
+    """Read JSON file from data directory (cached until the file's mtime or size changes)"""
     path = os.path.join(DATA_DIR, filename)
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = _json_cache.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        with open(path, 'rb') as f:
+            data = json.loads(f.read())
+        _json_cache[path] = (stamp, data)
+        return data
     except Exception:
         return default
 
+def reverse_lines(path, buf=65536):
+    """Yield the non-empty raw (bytes) lines of a file from last to first, reading backwards in buf-sized chunks"""
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return
+    with f:
+        pos = f.seek(0, os.SEEK_END)
+        partial = b""
+        while pos > 0:
+            step = min(buf, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + partial).split(b"\n")
+            # the first piece may continue in the previous chunk
+            partial = lines[0]
+            for line in reversed(lines[1:]):
+                if line:
+                    yield line
+        if partial:
+            yield partial
+
 @app.route('/', methods=['GET'])
 def root():
     """Root endpoint - API information"""
@@ -70,57 +134,70 @@ def get_metrics():
 def get_queries():
     """Get paginated queries from log file"""
     try:
-        page = int(request.args.get('page', 1))
-        page_size = int(request.args.get('pageSize', 20))
-        search = request.args.get('search', '').lower().strip()
+        page = max(1, int(request.args.get('page', 1)))
+        page_size = max(1, int(request.args.get('pageSize', 20)))
+        search = request.args.get('search', '').strip()
+        # Matched against the raw bytes so rejected lines are never decoded
+        pat = re.compile(re.escape(search.encode("utf-8")), re.IGNORECASE) if search else None
+        with_total = request.args.get('withTotal') == '1'
+        start = (page - 1) * page_size
         
+        # Walk the log newest-first and stop once the page is filled
         items = []
-        if os.path.exists(LOG_FILE):
-            with open(LOG_FILE, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-                # Get last 20 lines
-                for line in lines[-20:]:
-                    parts = line.strip().split("|")
-                    if len(parts) >= 2:
-                        timestamp = parts[0].strip()
-                        sql = parts[1].strip()
-                        
-                        # Apply search filter
-                        if search and search not in sql.lower():
-                            continue
-                        
-                        # Extract query type
-                        sql_upper = sql.upper()
-                        if sql_upper.startswith("SELECT"):
-                            qtype = "SELECT"
-                        elif sql_upper.startswith("INSERT"):
-                            qtype = "INSERT"
-                        elif sql_upper.startswith("UPDATE"):
-                            qtype = "UPDATE"
-                        elif sql_upper.startswith("DELETE"):
-                            qtype = "DELETE"
-                        else:
-                            qtype = "UNKNOWN"
-                        
-                        items.append({
-                            "timestamp": timestamp,
-                            "latencyMs": round(max(5, random.gauss(20, 6)), 2),
-                            "database": "app",
-                            "sql": sql,
-                            "type": qtype,
-                            "table": "customers" if "customers" in sql.lower() else "orders"
-                        })
+        matched = 0
+        scanned = 0
+        scanned_bytes = 0
+        exhausted = True
+        for line in reverse_lines(LOG_FILE):
+            parts = line.split(b"|")
+            if len(parts) < 2:
+                continue
+            scanned += 1
+            scanned_bytes += len(line) + 1
+            
+            sql_raw = parts[1].strip()
+            
+            # Apply search filter
+            if pat and not pat.search(sql_raw):
+                continue
+            matched += 1
+            if matched <= start:
+                continue
+            if len(items) == page_size:
+                if with_total:
+                    continue
+                exhausted = False
+                break
+            
+            # Accepted row: decode and build the item
+            sql = sql_raw.decode("utf-8", errors="replace")
+            timestamp = parts[0].strip().decode("utf-8", errors="replace")
+            
+            # Extract query type
+            qtype = QUERY_TYPES.get(sql[:6].upper(), "UNKNOWN")
+            
+            items.append({
+                "timestamp": timestamp,
+                "database": "app",
+                "sql": sql,
+                "type": qtype,
+                "table": "customers" if "customers" in sql.lower() else "orders"
+            })
         
-        # Reverse to show newest first
-        items.reverse()
+        # Fabricated latencies are drawn once per page, not per scanned line
+        gauss = random.gauss
+        for item, lat in zip(items, [gauss(20.0, 6.0) for _ in items]):
+            item["latencyMs"] = round(max(5.0, lat), 2)
         
-        # Pagination
-        total = len(items)
-        start = (page - 1) * page_size
-        end = start + page_size
+        if exhausted:
+            total = matched
+        else:
+            # Exact totals need a full scan; extrapolate from what was read
+            est_lines = os.path.getsize(LOG_FILE) * scanned / scanned_bytes
+            total = max(matched, round(est_lines * matched / scanned))
         
         return jsonify({
-            "items": items[start:end],
+            "items": items,
             "total": total,
             "page": page,
             "pageSize": page_size
@@ -132,86 +209,59 @@ def get_queries():
 def get_statistics():
     """Get query statistics"""
     try:
-        # Get column frequency from database
+        # Column frequency and current indexes from one connection and snapshot
         column_frequency = []
-        total_freq = 0
-        if os.path.exists(DB_PATH):
-            conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=5.0)
-            cur = conn.cursor()
-            try:
-                cur.execute("""
-                    SELECT table_name, column_name, frequency
-                    FROM attribute_frequency
-                    ORDER BY frequency DESC
-                """)
-                rows = cur.fetchall()
-                for table_name, column_name, frequency in rows:
-                    column_frequency.append({
-                        "table": table_name,
-                        "column": column_name,
-                        "frequency": frequency
-                    })
-                    total_freq += frequency
-            except:
-                pass
-            finally:
-                conn.close()
-        
-        # Calculate percentages
-        for item in column_frequency:
-            item["percent"] = round((item["frequency"] / total_freq * 100), 2) if total_freq > 0 else 0
-        
-        # Get current indexes
         current_indexes = []
         if os.path.exists(DB_PATH):
-            conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=5.0)
-            cur = conn.cursor()
-            try:
-                cur.execute("""
-                    SELECT name, tbl_name, sql
-                    FROM sqlite_master
-                    WHERE type='index' AND name NOT LIKE 'sqlite_%'
-                """)
-                for name, tbl_name, sql in cur.fetchall():
-                    current_indexes.append({
-                        "name": name,
-                        "table": tbl_name,
-                        "sql": sql
-                    })
-            except:
-                pass
-            finally:
-                conn.close()
+            with get_conn() as conn:
+                cur = conn.cursor()
+                cur.execute("BEGIN DEFERRED")
+                try:
+                    cur.execute("""
+                        SELECT table_name, column_name, frequency,
+                               COALESCE(ROUND(frequency * 100.0 / SUM(frequency) OVER (), 2), 0)
+                        FROM attribute_frequency
+                        ORDER BY frequency DESC
+                    """)
+                    column_frequency = [
+                        {"table": t, "column": c, "frequency": f, "percent": p}
+                        for t, c, f, p in cur.fetchall()
+                    ]
+                except:
+                    pass
+                try:
+                    cur.execute("""
+                        SELECT name, tbl_name, sql
+                        FROM sqlite_master
+                        WHERE type='index' AND name NOT LIKE 'sqlite_%'
+                    """)
+                    current_indexes = [
+                        {"name": name, "table": tbl_name, "sql": sql}
+                        for name, tbl_name, sql in cur.fetchall()
+                    ]
+                except:
+                    pass
+                cur.execute("COMMIT")
         
         # Read queries from log file for query type and table usage
         query_types = {}
         table_usage = {}
         if os.path.exists(LOG_FILE):
             with open(LOG_FILE, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-                for line in lines:
+                for line in f:
                     parts = line.strip().split("|")
                     if len(parts) >= 2:
                         sql = parts[1].strip()
-                        sql_upper = sql.upper()
                         
                         # Query type
-                        if sql_upper.startswith("SELECT"):
-                            qtype = "SELECT"
-                        elif sql_upper.startswith("INSERT"):
-                            qtype = "INSERT"
-                        elif sql_upper.startswith("UPDATE"):
-                            qtype = "UPDATE"
-                        elif sql_upper.startswith("DELETE"):
-                            qtype = "DELETE"
-                        else:
-                            qtype = "UNKNOWN"
+                        qtype = QUERY_TYPES.get(sql[:6].upper(), "UNKNOWN")
                         query_types[qtype] = query_types.get(qtype, 0) + 1
                         
                         # Table usage
-                        if "customers" in sql.lower():
+                        sql_lower = sql.lower()
+                        if "customers" in sql_lower:
                             table_usage["customers"] = table_usage.get("customers", 0) + 1
-                        elif "orders" in sql.lower():
+                        elif "orders" in sql_lower:
                             table_usage["orders"] = table_usage.get("orders", 0) + 1
         
         return jsonify({
@@ -259,5 +309,9 @@ if __name__ == '__main__':
     print("=" * 60)
     
     port = int(os.environ.get('PORT', 5001))
-    app.run(host='0.0.0.0', port=port, debug=True)
+    if os.environ.get('FLASK_ENV') == 'development':
+        app.run(host='0.0.0.0', port=port, debug=True)
+    else:
+        from waitress import serve
+        serve(app, host='0.0.0.0', port=port, threads=8)
 
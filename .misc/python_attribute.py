@@ -1,37 +1,59 @@
 import sqlite3
 import re
 from collections import Counter
+from functools import lru_cache
 
 DB_NAME = "autoindex4.db"
 
-def analyze_queries():
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT query FROM query_log_update2")
-    queries = cursor.fetchall()
-    conn.close()
-
-    column_counter = Counter()
+# "column =" in a WHERE or SET clause, compiled once
+COL_RE = re.compile(r"\b(\w+)\s*=")
 
-    where_pattern = re.compile(r"\bWHERE\b\s+(.*)", re.IGNORECASE)
-    set_pattern = re.compile(r"\bSET\b\s+(.*)", re.IGNORECASE)
-    insert_pattern = re.compile(r"\bINSERT INTO users\s*\((.*?)\)", re.IGNORECASE)
-    column_pattern = re.compile(r"\b(\w+)\s*=")
+# Running column counts and the last query_log_update2 id folded into them
+_column_counter = Counter()
+_last_id = 0
 
-    for (query,) in queries:
-        if where_match := where_pattern.search(query):
-            columns = column_pattern.findall(where_match.group(1))
-            column_counter.update(columns)
+@lru_cache(maxsize=10000)
+def query_columns(query):
+    """Columns a query references in WHERE, SET and INSERT clauses (cached; queries repeat)"""
+    # the generator's grammar is fixed, so clauses are found by verb and keyword
+    verb = query[:6].upper()
+    upper = query.upper()
+    if verb == "INSERT":
+        if upper.startswith("INSERT INTO USERS"):
+            start = query.find("(")
+            end = query.find(")", start)
+            if start != -1 and end != -1:
+                return tuple(col.strip() for col in query[start + 1:end].split(","))
+        return ()
 
-        if set_match := set_pattern.search(query):
-            columns = column_pattern.findall(set_match.group(1))
-            column_counter.update(columns)
+    columns = []
+    where = upper.find(" WHERE ")
+    if where != -1:
+        columns.extend(COL_RE.findall(query, where + 7))
+    if verb == "UPDATE":
+        # like the SET clause match before it, this runs on through the WHERE clause
+        set_at = upper.find(" SET ")
+        if set_at != -1:
+            columns.extend(COL_RE.findall(query, set_at + 5))
+    return tuple(columns)
 
-        if insert_match := insert_pattern.search(query):
-            columns = [col.strip() for col in insert_match.group(1).split(",")]
-            column_counter.update(columns)
+def analyze_queries():
+    """Column usage counts, folding in only the queries logged since the last call"""
+    global _last_id
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    # the log only grows; a smaller MAX(id) means it was recreated
+    if cursor.execute("SELECT COALESCE(MAX(id), 0) FROM query_log_update2").fetchone()[0] < _last_id:
+        _column_counter.clear()
+        _last_id = 0
+    # rows are streamed off the cursor; only the counts are kept
+    cursor.execute("SELECT id, query FROM query_log_update2 WHERE id > ? ORDER BY id", (_last_id,))
+    for row_id, query in cursor:
+        _column_counter.update(query_columns(query))
+        _last_id = row_id
+    conn.close()
 
-    return column_counter
+    return Counter(_column_counter)
 
 def print_query_stats():
     usage = analyze_queries()
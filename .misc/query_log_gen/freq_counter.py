@@ -1,8 +1,15 @@
 import re
 import time
 import os
+import mmap
 import sqlite3
 from collections import Counter
+from functools import lru_cache
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except Exception:  # optional; Linux only
+    INotify = None
 
 LOG_FILE = "query_log.txt"
 STATUS_FILE = "generator_status.txt"
@@ -10,6 +17,8 @@ DB_PATH = "auto_index.db"
 REFRESH_INTERVAL = 2
 GENERATOR_TIMEOUT = 10
 CHECK_INTERVAL = 1.0
+# cursor home + clear screen, written instead of spawning cls/clear
+CLEAR_SCREEN = "\033[H\033[2J"
 
 # Regex patterns for columns and table extraction
 COLUMN_PATTERNS = [
@@ -21,27 +30,33 @@ COLUMN_PATTERNS = [
     r"INSERT\s+INTO\s+\w+\s*\((.*?)\)"
 ]
 
-TABLE_PATTERN = r"(?:FROM|INTO|UPDATE|JOIN)\s+([a-zA-Z_][a-zA-Z0-9_]*)"
-
-# --- Extract column names ---
+TABLE_PATTERN = re.compile(r"(?:FROM|INTO|UPDATE|JOIN)\s+([a-zA-Z_][a-zA-Z0-9_]*)", re.IGNORECASE)
+COLUMN_RES = [re.compile(p, re.IGNORECASE) for p in COLUMN_PATTERNS]
+SPLIT_RE = re.compile(r"[,\s=]+")
+IDENT_RE = re.compile(r"^[A-Z_][A-Z0-9_]*$")
+STOPWORDS = frozenset({
+    "SELECT", "FROM", "WHERE", "AND", "OR", "AS", "ON", "IN",
+    "VALUES", "SET", "BY", "GROUP", "ORDER"
+})
+
+# --- Extract column names (cached; the log repeats a few query templates) ---
+@lru_cache(maxsize=512)
 def extract_columns(sql):
     cols = []
     sql_upper = sql.upper()
-    for pattern in COLUMN_PATTERNS:
-        matches = re.findall(pattern, sql_upper, re.IGNORECASE)
+    for pattern in COLUMN_RES:
+        matches = pattern.findall(sql_upper)
         for match in matches:
-            for col in re.split(r"[,\s=]+", match):
+            for col in SPLIT_RE.split(match):
                 col = col.strip().replace("(", "").replace(")", "")
-                if col and re.match(r"^[A-Z_][A-Z0-9_]*$", col) and col.upper() not in {
-                    "SELECT", "FROM", "WHERE", "AND", "OR", "AS", "ON", "IN",
-                    "VALUES", "SET", "BY", "GROUP", "ORDER"
-                }:
+                if col and IDENT_RE.match(col) and col not in STOPWORDS:
                     cols.append(col.lower())
-    return cols
+    return tuple(cols)
 
-# --- Extract table name ---
+# --- Extract table name (cached like extract_columns) ---
+@lru_cache(maxsize=512)
 def extract_table(sql):
-    match = re.search(TABLE_PATTERN, sql, re.IGNORECASE)
+    match = TABLE_PATTERN.search(sql)
     if match:
         return match.group(1).lower()
     return "unknown"
@@ -59,21 +74,68 @@ def is_generator_alive():
     except Exception:
         return True
 
-# --- Follow log file ---
+# --- Follow log file, yielding the lines available at each read as one batch ---
+FOLLOW_BATCH_BYTES = 1 << 20
+
 def follow_log(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        f.seek(0, 0)
-        while True:
-            if not is_generator_alive():
-                time.sleep(CHECK_INTERVAL)
-                if not is_generator_alive():
-                    break
-
-            line = f.readline()
-            if not line:
-                time.sleep(0.5)
-                continue
-            yield line
+    # the file is mmap'd (remapped as it grows); each batch is the complete
+    # lines after the cursor, decoded in one go - a partial last line waits
+    with open(file_path, "rb") as f:
+        fd = f.fileno()
+        mm = None
+        pos = 0
+        watcher = None
+        if INotify is not None:
+            try:
+                watcher = INotify()
+                watcher.add_watch(file_path, inotify_flags.MODIFY)
+            except Exception:
+                watcher = None
+        next_check = 0.0
+        try:
+            while True:
+                # reading the heartbeat file is the costly part of a poll, so
+                # do it at most once per CHECK_INTERVAL
+                now = time.monotonic()
+                if now >= next_check:
+                    next_check = now + CHECK_INTERVAL
+                    if not is_generator_alive():
+                        time.sleep(CHECK_INTERVAL)
+                        if not is_generator_alive():
+                            break
+
+                size = os.fstat(fd).st_size
+                if size != (len(mm) if mm is not None else 0):
+                    if mm is not None:
+                        mm.close()
+                        mm = None
+                    if size < pos:
+                        pos = 0  # file was replaced, start over
+                    if size:
+                        mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+
+                end = -1
+                if mm is not None and len(mm) > pos:
+                    # about a megabyte at a time, so a long backlog is not read in one go
+                    end = mm.rfind(b"\n", pos, pos + FOLLOW_BATCH_BYTES)
+                    if end < 0:  # one line longer than a batch
+                        end = mm.find(b"\n", pos)
+                if end < 0:
+                    if watcher is not None:
+                        # wakes as soon as the log is written; the timeout keeps
+                        # the generator liveness check running while it is idle
+                        watcher.read(timeout=500)
+                    else:
+                        time.sleep(0.5)
+                    continue
+                lines = mm[pos:end].decode("utf-8").split("\n")
+                pos = end + 1
+                yield lines
+        finally:
+            if mm is not None:
+                mm.close()
+            if watcher is not None:
+                watcher.close()
 
 # --- Initialize or reset the frequency table ---
 def init_db():
@@ -86,64 +148,86 @@ def init_db():
             frequency INTEGER
         )
     """)
+    # this run's counts start from zero; clearing first also lets the unique
+    # index build on files written before it existed
+    cur.execute("DELETE FROM attribute_frequency")
+    # one row per column, the conflict target for save_frequencies_to_db's UPSERT
+    cur.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_freq_unique
+        ON attribute_frequency(table_name, column_name)
+    """)
     conn.commit()
     conn.close()
 
-# --- Save frequency data into SQLite ---
-def save_frequencies_to_db(counter):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-
-    # clear old entries before inserting new ones
-    cur.execute("DELETE FROM attribute_frequency")
+# --- Writer connection, opened once and reused by every save ---
+_write_conn = None
 
-    # Insert updated frequencies
-    for key, freq in counter.items():
-        table_name, column_name = key.split(".")
-        cur.execute("""
-            INSERT INTO attribute_frequency (table_name, column_name, frequency)
-            VALUES (?, ?, ?)
-        """, (table_name, column_name, freq))
+def get_write_conn():
+    global _write_conn
+    if _write_conn is None:
+        # the generator writes to the same file; wait out its transactions
+        # instead of failing with "database is locked"
+        _write_conn = sqlite3.connect(DB_PATH, timeout=5.0)
+        _write_conn.execute("PRAGMA synchronous=NORMAL;")
+    return _write_conn
 
+# --- Save frequency data into SQLite ---
+def save_frequencies_to_db(counter, keys=None):
+    """Upsert the counts of (table, column) keys (default: every key) in one transaction"""
+    if keys is None:
+        keys = counter.keys()
+    rows = [(table_name, col, counter[table_name, col]) for table_name, col in keys]
+    if not rows:
+        return
+    conn = get_write_conn()
+    conn.executemany("""
+        INSERT INTO attribute_frequency (table_name, column_name, frequency)
+        VALUES (?, ?, ?)
+        ON CONFLICT(table_name, column_name) DO UPDATE SET frequency = excluded.frequency
+    """, rows)
     conn.commit()
-    conn.close()
 
 # --- Live Analyzer ---
 def live_analyzer():
     counter = Counter()
-    last_refresh = 0
+    # keys counted since the last save; only these are written
+    dirty = set()
+    last_refresh = float("-inf")
 
+    if os.name == "nt":
+        os.system("")  # once, so the Windows console interprets ANSI escapes
     print("Frequency counter started. Data will be stored in 'attribute_frequency' table.\n")
     init_db()
 
-    for line in follow_log(LOG_FILE):
-        parts = line.split("|")
-        if len(parts) < 3:
-            continue
+    for lines in follow_log(LOG_FILE):
+        for line in lines:
+            parts = line.split("|")
+            if len(parts) < 3:
+                continue
 
-        sql_part = parts[1].strip()
-        table_name = extract_table(sql_part)
-        cols = extract_columns(sql_part)
+            sql_part = parts[1].strip()
+            table_name = extract_table(sql_part)
+            cols = extract_columns(sql_part)
 
-        for col in cols:
-            counter[f"{table_name}.{col}"] += 1
+            for col in cols:
+                key = (table_name, col)
+                counter[key] += 1
+                dirty.add(key)
 
         # Refresh display and update DB
-        if time.time() - last_refresh >= REFRESH_INTERVAL:
-            os.system("cls" if os.name == "nt" else "clear")
-            print("Attribute Usage Frequency (auto-updating in database)\n")
-
-            # Print to terminal
-            for key, count in sorted(counter.items(), key=lambda x: x[1], reverse=True):
-                t, c = key.split(".")
-                print(f"{t:<12} | {c:<15} -> {count} times")
+        now = time.monotonic()
+        if now - last_refresh >= REFRESH_INTERVAL:
+            # Print to terminal, clearing it in the same single write
+            rows = [f"{t:<12} | {c:<15} -> {count} times" for (t, c), count in counter.most_common()]
+            print(CLEAR_SCREEN + "Attribute Usage Frequency (auto-updating in database)\n\n" + "\n".join(rows))
 
             # Save to database
-            save_frequencies_to_db(counter)
-            last_refresh = time.time()
+            save_frequencies_to_db(counter, dirty)
+            dirty.clear()
+            last_refresh = now
 
     print("\nGenerator stopped. Saving final data to database...\n")
-    save_frequencies_to_db(counter)
+    save_frequencies_to_db(counter, dirty)
     print("Counter terminated.\n")
 
 # --- Entry Point ---
@@ -1,6 +1,11 @@
 import sqlite3
 import json
 
+try:
+    import orjson  # optional, faster serialization
+except Exception:
+    orjson = None
+
 DB_PATH = "auto_index.db"
 OUTPUT_JSON = "frequency_stats.json"
 
@@ -9,32 +14,40 @@ def export_frequency_stats():
     cur = conn.cursor()
 
     cur.execute("""
-        SELECT table_name, column_name, frequency
+        SELECT table_name, column_name, frequency,
+               COALESCE(ROUND(frequency * 100.0 / SUM(frequency) OVER (), 2), 0)
         FROM attribute_frequency
         ORDER BY frequency DESC
     """)
-    rows = cur.fetchall()
+    # Stream rows to disk in batches instead of materializing them all
+    count = 0
+    with open(OUTPUT_JSON, "wb") as out:
+        out.write(b"[")
+        while True:
+            rows = cur.fetchmany(1000)
+            if not rows:
+                break
+            for t, c, f, p in rows:
+                record = {
+                    "table_name": t,
+                    "column_name": c,
+                    "frequency": f,
+                    "frequency_percent": p
+                }
+                out.write(b",\n" if count else b"\n")
+                if orjson:
+                    out.write(orjson.dumps(record))
+                else:
+                    out.write(json.dumps(record).encode("utf-8"))
+                count += 1
+        out.write(b"\n]\n" if count else b"]\n")
     conn.close()
 
-    if not rows:
+    if not count:
         print("No data found in attribute_frequency table.")
         return
 
-    total_freq = sum(freq for _, _, freq in rows)
-    data = [
-        {
-            "table_name": t,
-            "column_name": c,
-            "frequency": f,
-            "frequency_percent": round((f / total_freq) * 100, 2)
-        }
-        for t, c, f in rows
-    ]
-
-    with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
-
-    print(f"Exported {len(data)} records to {OUTPUT_JSON}.")
+    print(f"Exported {count} records to {OUTPUT_JSON}.")
 
 if __name__ == "__main__":
     export_frequency_stats()
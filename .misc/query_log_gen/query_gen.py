@@ -1,8 +1,7 @@
 import sqlite3
 import threading
-import queue
+import collections
 import time
-import datetime
 import random
 import signal
 import os
@@ -11,10 +10,15 @@ DB_PATH = "auto_index.db"
 LOG_FILE = "query_log.txt"
 STATUS_FILE = "generator_status.txt"
 FLUSH_INTERVAL = 2
+DB_BATCH_MAX = 100
+DEBUG = False  # echo every executed statement to stdout
 FOCUS_ROTATION_INTERVAL = 6  
 
-q = queue.Queue()
-log_buffer = []
+# producer -> db_worker channel; deque append/popleft are atomic, so the
+# condition is only used to wake an idle worker
+q = collections.deque()
+q_ready = threading.Condition()
+log_buffer = bytearray()  # encoded log lines awaiting the flusher
 buffer_lock = threading.Lock()
 stop_event = threading.Event()
 
@@ -24,14 +28,40 @@ ORDER_COLS = ["customer_id", "order_date", "amount", "status", "id"]
 customer_cycle = CUSTOMER_COLS.copy()
 order_cycle = ORDER_COLS.copy()
 
+# every (table, column, query type) statement generate_query can emit, built once
+SQL_TEMPLATES = {}
+for _table, _cols in (("customers", CUSTOMER_COLS), ("orders", ORDER_COLS)):
+    for _col in _cols:
+        SQL_TEMPLATES[(_table, _col, "UPDATE")] = f"UPDATE {_table} SET {_col} = ? WHERE id = ?"
+        SQL_TEMPLATES[(_table, _col, "DELETE")] = f"DELETE FROM {_table} WHERE {_col} = ?"
+for _col in CUSTOMER_COLS:
+    SQL_TEMPLATES[("customers", _col, "SELECT")] = f"SELECT * FROM customers WHERE {_col} = ?"
+for _col in ORDER_COLS:
+    SQL_TEMPLATES[("orders", _col, "SELECT")] = f"SELECT * FROM orders WHERE {_col} > ? ORDER BY order_date DESC"
+
 current_focus = {
     "customers": {"most": customer_cycle[0], "least": customer_cycle[-1]},
     "orders": {"most": order_cycle[0], "least": order_cycle[-1]}
 }
 
+# (epoch second, formatted string) of the last timestamp handed out
+_ts_cache = [0, ""]
+
+
+def now_str():
+    """Current local time as "%Y-%m-%d %H:%M:%S", formatted once per second."""
+    s = int(time.time())
+    c = _ts_cache
+    if s != c[0]:
+        c[0] = s
+        c[1] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(s))
+    return c[1]
+
 
 def init_db():
     conn = sqlite3.connect(DB_PATH)
+    # WAL is stored in the database file, so every later connection uses it
+    conn.execute("PRAGMA journal_mode=WAL;")
     cur = conn.cursor()
     cur.executescript("""
     CREATE TABLE IF NOT EXISTS customers (
@@ -85,59 +115,105 @@ def generate_query():
             values = (f"User{random.randint(1,10000)}",
                       f"user{random.randint(1,10000)}@mail.com",
                       random.choice(["Delhi", "Mumbai", "Pune", "Kolkata"]),
-                      datetime.datetime.now().strftime("%Y-%m-%d"))
+                      now_str()[:10])
             return ("INSERT INTO customers (name, email, city, join_date) VALUES (?, ?, ?, ?)", values)
         else:
             values = (random.randint(1, 50),
-                      datetime.datetime.now().strftime("%Y-%m-%d"),
+                      now_str()[:10],
                       round(random.uniform(500, 10000), 2),
                       random.choice(["Pending", "Shipped", "Delivered"]))
             return ("INSERT INTO orders (customer_id, order_date, amount, status) VALUES (?, ?, ?, ?)", values)
 
     elif qtype == "UPDATE":
         value = f"Update{random.randint(100,999)}"
-        return (f"UPDATE {table} SET {focus_col} = ? WHERE id = ?", (value, random.randint(1, 50)))
+        return (SQL_TEMPLATES[(table, focus_col, "UPDATE")], (value, random.randint(1, 50)))
 
     elif qtype == "DELETE":
         value = random.choice(["Delhi", "Mumbai", "Pending", "Delivered"])
-        return (f"DELETE FROM {table} WHERE {focus_col} = ?", (value,))
+        return (SQL_TEMPLATES[(table, focus_col, "DELETE")], (value,))
 
     else:  # SELECT
         if table == "customers":
-            return (f"SELECT * FROM customers WHERE {focus_col} = ?", (random.choice(["Delhi", "Pune", "Kolkata"]),))
+            return (SQL_TEMPLATES[("customers", focus_col, "SELECT")], (random.choice(["Delhi", "Pune", "Kolkata"]),))
         else:
-            return (f"SELECT * FROM orders WHERE {focus_col} > ? ORDER BY order_date DESC", (random.randint(1000, 8000),))
+            return (SQL_TEMPLATES[("orders", focus_col, "SELECT")], (random.randint(1000, 8000),))
+
+
+def execute_group(cur, sql, params_list):
+    """Run one statement for each params tuple, as a single executemany when it is a write"""
+    if len(params_list) > 1 and not sql.startswith("SELECT"):
+        cur.execute("SAVEPOINT grp")
+        try:
+            cur.executemany(sql, [params or () for params in params_list])
+            cur.execute("RELEASE grp")
+            if DEBUG:
+                for params in params_list:
+                    print(f"[EXECUTING] {sql} | {params}")
+            return
+        except Exception:
+            # a bad row: undo the group and run it row by row below
+            cur.execute("ROLLBACK TO grp")
+            cur.execute("RELEASE grp")
+    for params in params_list:
+        try:
+            cur.execute(sql, params or ())
+            if DEBUG:
+                print(f"[EXECUTING] {sql} | {params}")
+        except Exception as e:
+            print(f"[ERROR] {e}")
 
 
 def db_worker():
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    """Execute queued queries in batches of up to DB_BATCH_MAX, one commit per batch"""
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=5.0)
+    # per-connection settings, applied once; NORMAL is crash-safe under WAL
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute("PRAGMA cache_size=-65536;")
+    conn.execute("PRAGMA temp_store=MEMORY;")
     cur = conn.cursor()
-    while not stop_event.is_set() or not q.empty():
+    while not stop_event.is_set() or q:
+        # whatever is already queued joins this transaction
+        batch = []
+        while len(batch) < DB_BATCH_MAX:
+            try:
+                batch.append(q.popleft())
+            except IndexError:
+                break
+        if not batch:
+            with q_ready:
+                q_ready.wait(timeout=0.1)
+            continue
+        # one executemany per distinct statement
+        grouped = {}
+        for sql, params in batch:
+            grouped.setdefault(sql, []).append(params)
+        for sql, params_list in grouped.items():
+            execute_group(cur, sql, params_list)
+        timestamp = now_str()
+        lines = "".join([f"{timestamp} | {sql} | {params}\n" for sql, params in batch]).encode("utf-8")
         try:
-            sql, params = q.get(timeout=0.1)
-            cur.execute(sql, params or ())
             conn.commit()
-            print(f"[EXECUTING] {sql} | {params}")
-        except queue.Empty:
-            continue
         except Exception as e:
             print(f"[ERROR] {e}")
-        finally:
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            with buffer_lock:
-                log_buffer.append(f"{timestamp} | {sql} | {params}\n")
-            q.task_done()
+        with buffer_lock:
+            log_buffer.extend(lines)
     conn.close()
 
 
 def flusher():
-    while not stop_event.is_set():
-        time.sleep(FLUSH_INTERVAL)
-        with buffer_lock:
-            if log_buffer:
-                with open(LOG_FILE, "a", encoding="utf-8") as f:
-                    f.writelines(log_buffer)
-                log_buffer.clear()
+    global log_buffer
+    fd = os.open(LOG_FILE, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        while not stop_event.is_set():
+            time.sleep(FLUSH_INTERVAL)
+            # swap under the lock, write outside it so db_worker never waits on disk
+            with buffer_lock:
+                buf, log_buffer = log_buffer, bytearray()
+            view = memoryview(buf)
+            while view:
+                view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
 
 
 def signal_handler(sig, frame):
@@ -150,22 +226,36 @@ def main():
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
-    threading.Thread(target=db_worker, daemon=True).start()
+    worker = threading.Thread(target=db_worker, daemon=True)
+    worker.start()
     threading.Thread(target=flusher, daemon=True).start()
     threading.Thread(target=rotate_focus, daemon=True).start()
 
     print("Query generator running. Press Ctrl+C to stop.\n")
 
+    # heartbeat file kept open and rewritten in place at most once a second;
+    # freq_counter allows GENERATOR_TIMEOUT (10s) between beats
+    status_fd = os.open(STATUS_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    last_heartbeat = 0.0
     try:
         while not stop_event.is_set():
-            q.put(generate_query())
-            with open(STATUS_FILE, "w") as f:
-                f.write(str(time.time()))
+            q.append(generate_query())
+            with q_ready:
+                q_ready.notify()
+            now = time.time()
+            if now - last_heartbeat >= 1.0:
+                # fixed width, so each write fully covers the previous one
+                os.lseek(status_fd, 0, os.SEEK_SET)
+                os.write(status_fd, b"%.6f" % now)
+                last_heartbeat = now
             time.sleep(0.05)
     except KeyboardInterrupt:
         stop_event.set()
+    finally:
+        os.close(status_fd)
 
-    q.join()
+    # db_worker drains the deque before exiting
+    worker.join()
     time.sleep(FLUSH_INTERVAL + 0.2)
     with open(STATUS_FILE, "w") as f:
         f.write("STOP")
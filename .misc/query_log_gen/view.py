@@ -1,4 +1,5 @@
 import sqlite3
-conn = sqlite3.connect("auto_index.db")
+# read-only: viewing never takes the write lock the generator and counter need
+conn = sqlite3.connect("file:auto_index.db?mode=ro", uri=True)
 for row in conn.execute("SELECT * FROM attribute_frequency ORDER BY frequency DESC"):
     print(row)
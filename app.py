@@ -1,21 +1,78 @@
-from flask import Flask, render_template, jsonify, request, redirect
+from flask import Flask, Response, render_template, jsonify, request, redirect
 from datetime import datetime, timezone
+import hashlib
 import os
 import random
 import sqlite3
 import time
 import traceback
-import requests
+import urllib3
 
-from backend.config import read_json, write_json, DB_PATH, LOG_FILE
-from backend.query_generator import extract_table
+from backend.config import dumps_json, read_json, write_json, DB_PATH
+from backend.db_pool import get_conn
+from backend.json_provider import ORJSONProvider
 from backend.simulator import (
-    start_simulator_thread,
-    start_index_manager_thread,
-    start_focus_rotation_thread,
+    query_snapshot,
+    simulator,
+    start_scheduler_thread,
 )
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+
+# keep-alive connection pool for proxying to the REST backend
+_http = urllib3.PoolManager(num_pools=4, maxsize=16, retries=1)
+
+
+def _proxy_body(url):
+    """GET url and return the upstream JSON body as bytes, passed through without re-encoding"""
+    res = _http.request('GET', url, timeout=3.0)
+    if res.status >= 400:
+        raise urllib3.exceptions.HTTPError(f"{url} returned {res.status}")
+    return res.data
+
+# proxied /metrics responses, keyed by URL
+METRICS_PROXY_TTL_SEC = 1.0
+_metrics_proxy_cache = {}
+
+# /api/statistics body and its ETag, reused while the DB is unchanged
+STATS_TTL_SEC = 2.0
+_stats_cache = {"key": None, "body": None, "etag": None, "ts": 0.0}
+
+
+def _stats_response(body, etag):
+    """JSON response with an ETag; 304 when the poller already has this body"""
+    res = Response(body, mimetype='application/json')
+    res.set_etag(etag)
+    return res.make_conditional(request)
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _search_where(search):
+    """WHERE clause and params matching search as a substring of the SQL"""
+    if not search:
+        return "", ()
+    # LIKE is case-insensitive for ASCII; escape its wildcards
+    like = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return "WHERE sql LIKE ? ESCAPE '\\'", (f"%{like}%",)
+
+
+def _count_older_matches(search, before_id):
+    """Count logged queries older than before_id that match search"""
+    if not os.path.exists(DB_PATH):
+        return 0
+    where, params = _search_where(search)
+    with get_conn() as conn:
+        return conn.execute(
+            f"SELECT COUNT(*) FROM query_log {where} AND id < ?",
+            params + (before_id,),
+        ).fetchone()[0]
 
 
 @app.route('/')
@@ -62,14 +119,20 @@ def api_metrics():
     )
     if settings.get('dataSource') == 'rest' and settings.get('backendBaseUrl'):
         try:
-            res = requests.get(
-                settings['backendBaseUrl'].rstrip('/') + '/metrics',
-                timeout=3,
-            )
-            return jsonify(res.json())
+            url = settings['backendBaseUrl'].rstrip('/') + '/metrics'
+            hit = _metrics_proxy_cache.get(url)
+            if not hit or time.time() - hit[0] >= METRICS_PROXY_TTL_SEC:
+                hit = (time.time(), _proxy_body(url))
+                _metrics_proxy_cache[url] = hit
+            return Response(hit[1], mimetype='application/json')
         except Exception:
             pass
 
+    # live series when the simulator runs in this process
+    data = simulator.snapshot_metrics_json()
+    if data is not None:
+        return Response(data, mimetype='application/json')
+
     data = read_json(
         'metrics.json',
         {
@@ -89,7 +152,7 @@ def api_metrics():
 
 @app.route('/api/queries')
 def api_queries():
-    """Read queries from query_log.txt (last 20) or REST backend"""
+    """Read a page of queries from the query_log table (newest first) or REST backend"""
     settings = read_json(
         'settings.json',
         {"dataSource": "json", "backendBaseUrl": ""},
@@ -103,65 +166,87 @@ def api_queries():
                 f"{settings['backendBaseUrl'].rstrip('/')}"
                 f"/queries?page={page}&pageSize={page_size}&search={search}"
             )
-            res = requests.get(url, timeout=3)
-            return jsonify(res.json())
+            return Response(_proxy_body(url), mimetype='application/json')
         except Exception:
             pass
 
     try:
-        items = []
-        if os.path.exists(LOG_FILE):
-            with open(LOG_FILE, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-                for line in lines[-20:]:
-                    parts = line.strip().split("|")
-                    if len(parts) >= 2:
-                        timestamp = parts[0].strip()
-                        sql = parts[1].strip()
-                        params = parts[2].strip() if len(parts) > 2 else ""
-
-                        sql_upper = sql.upper()
-                        if sql_upper.startswith("SELECT"):
-                            qtype = "SELECT"
-                        elif sql_upper.startswith("INSERT"):
-                            qtype = "INSERT"
-                        elif sql_upper.startswith("UPDATE"):
-                            qtype = "UPDATE"
-                        elif sql_upper.startswith("DELETE"):
-                            qtype = "DELETE"
-                        else:
-                            qtype = "UNKNOWN"
-
-                        table = extract_table(sql)
-
-                        items.append(
-                            {
-                                "timestamp": timestamp,
-                                "latencyMs": round(max(5, random.gauss(20, 6)), 2),
-                                "database": "app",
-                                "sql": sql,
-                                "type": qtype,
-                                "table": table,
-                            }
-                        )
-
-        # newest first
-        items.reverse()
-
-        # search
-        search = request.args.get('search', '').lower().strip()
-        if search:
-            items = [q for q in items if search in q.get('sql', '').lower()]
-
-        # pagination
-        page = int(request.args.get('page', 1))
-        page_size = int(request.args.get('pageSize', 20))
-        total = len(items)
+        page = max(1, int(request.args.get('page', 1)))
+        page_size = max(1, int(request.args.get('pageSize', 20)))
+        search = request.args.get('search', '').strip()
+        before_id = request.args.get('before_id', type=int)
         start = (page - 1) * page_size
-        end = start + page_size
+
+        items = []
+        total = 0
+        # recent pages come straight from the simulator's in-memory window
+        snap = query_snapshot.page(
+            search, start, page_size, before_id, _count_older_matches
+        )
+        if snap is not None:
+            items, total = snap
+        elif os.path.exists(DB_PATH):
+            where, params = _search_where(search)
+            with get_conn() as conn:
+                if before_id is not None:
+                    # keyset: seek straight to the cursor, no rows skipped
+                    rows = conn.execute(
+                        f"""
+                        SELECT id, ts, sql, qtype, table_name
+                        FROM query_log {where + ' AND' if where else 'WHERE'} id < ?
+                        ORDER BY id DESC
+                        LIMIT ?
+                        """,
+                        params + (before_id, page_size),
+                    ).fetchall()
+                else:
+                    rows = conn.execute(
+                        f"""
+                        SELECT id, ts, sql, qtype, table_name
+                        FROM query_log {where}
+                        ORDER BY id DESC
+                        LIMIT ? OFFSET ?
+                        """,
+                        params + (page_size, start),
+                    ).fetchall()
+                if search:
+                    total = conn.execute(
+                        f"SELECT COUNT(*) FROM query_log {where}", params
+                    ).fetchone()[0]
+                else:
+                    # append-only, so the newest id is the row count
+                    total = conn.execute(
+                        "SELECT COALESCE(MAX(id), 0) FROM query_log"
+                    ).fetchone()[0]
+
+            for row_id, timestamp, sql, qtype, table in rows:
+                items.append(
+                    {
+                        "id": row_id,
+                        "timestamp": timestamp,
+                        "sql": sql,
+                        "type": qtype,
+                        "table": table,
+                    }
+                )
+
+        for item in items:
+            item["database"] = "app"
+        next_before_id = items[-1]["id"] if len(items) == page_size else None
+
+        # fabricated latencies are drawn once per page
+        gauss = random.gauss
+        for item, lat in zip(items, [gauss(20.0, 6.0) for _ in items]):
+            item["latencyMs"] = round(max(5.0, lat), 2)
 
         return jsonify(
-            {"items": items[start:end], "total": total, "page": page, "pageSize": page_size}
+            {
+                "items": items,
+                "total": total,
+                "page": page,
+                "pageSize": page_size,
+                "nextBeforeId": next_before_id,
+            }
         )
     except Exception:
         return jsonify({"items": [], "total": 0, "page": 1, "pageSize": 20})
@@ -177,133 +262,69 @@ def api_statistics():
     )
     if settings.get('dataSource') == 'rest' and settings.get('backendBaseUrl'):
         try:
-            res = requests.get(
-                settings['backendBaseUrl'].rstrip('/') + '/statistics',
-                timeout=3,
-            )
-            return jsonify(res.json())
+            url = settings['backendBaseUrl'].rstrip('/') + '/statistics'
+            return Response(_proxy_body(url), mimetype='application/json')
         except Exception:
             pass
 
+    key = (_mtime(DB_PATH), _mtime(DB_PATH + '-wal'))
+    if (
+        _stats_cache["key"] == key
+        and time.time() - _stats_cache["ts"] < STATS_TTL_SEC
+    ):
+        return _stats_response(_stats_cache["body"], _stats_cache["etag"])
+
     try:
         column_frequency = []
-        total_freq = 0
-
-        if os.path.exists(DB_PATH):
-            max_retries = 3
-            retry_delay = 0.1
-            for attempt in range(max_retries):
-                try:
-                    conn = sqlite3.connect(
-                        DB_PATH,
-                        check_same_thread=False,
-                        timeout=5.0,
-                    )
-                    cur = conn.cursor()
-                    cur.execute(
-                        """
-                        SELECT table_name, column_name, frequency
-                        FROM attribute_frequency
-                        ORDER BY frequency DESC
-                        """
-                    )
-                    rows = cur.fetchall()
-                    for table_name, column_name, frequency in rows:
-                        column_frequency.append(
-                            {
-                                "table": table_name,
-                                "column": column_name,
-                                "frequency": frequency,
-                            }
-                        )
-                        total_freq += frequency
-                    conn.close()
-                    break
-                except sqlite3.OperationalError as e:
-                    if "locked" in str(e).lower() and attempt < max_retries - 1:
-                        time.sleep(retry_delay * (attempt + 1))
-                        continue
-                    else:
-                        break
-                except Exception:
-                    break
-
-        for item in column_frequency:
-            item["percent"] = (
-                round((item["frequency"] / total_freq * 100), 2)
-                if total_freq > 0
-                else 0
-            )
-
         current_indexes = []
+        query_types = {}
+        table_usage = {}
         if os.path.exists(DB_PATH):
-            max_retries = 3
-            retry_delay = 0.1
-            for attempt in range(max_retries):
-                try:
-                    conn = sqlite3.connect(
-                        DB_PATH,
-                        check_same_thread=False,
-                        timeout=5.0,
-                    )
-                    cur = conn.cursor()
-                    cur.execute(
+            try:
+                # one statement, so one round trip and one read snapshot for all
+                # three lookups; rows are tagged with their source in the first column
+                with get_conn() as conn:
+                    rows = conn.execute(
                         """
-                        SELECT name, tbl_name, sql
+                        SELECT 'freq', table_name, column_name, frequency,
+                               COALESCE(ROUND(frequency * 100.0 / SUM(frequency) OVER (), 2), 0)
+                        FROM attribute_frequency
+                        UNION ALL
+                        SELECT 'index', tbl_name, name, NULL, sql
                         FROM sqlite_master
                         WHERE type='index' AND name NOT LIKE 'sqlite_%'
+                        UNION ALL
+                        -- maintained by the simulator as it logs each query
+                        SELECT kind, key, NULL, n, NULL FROM query_counters
+                        ORDER BY 1, 4 DESC
                         """
-                    )
-                    for name, tbl_name, sql in cur.fetchall():
-                        current_indexes.append(
-                            {"name": name, "table": tbl_name, "sql": sql}
-                        )
-                    conn.close()
-                    break
-                except sqlite3.OperationalError as e:
-                    if "locked" in str(e).lower() and attempt < max_retries - 1:
-                        time.sleep(retry_delay * (attempt + 1))
-                        continue
-                    else:
-                        break
-                except Exception:
-                    break
+                    ).fetchall()
 
-        query_types = {}
-        table_usage = {}
-        if os.path.exists(LOG_FILE):
-            with open(LOG_FILE, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-                for line in lines:
-                    parts = line.strip().split("|")
-                    if len(parts) >= 2:
-                        sql = parts[1].strip()
-                        sql_upper = sql.upper()
-
-                        if sql_upper.startswith("SELECT"):
-                            qtype = "SELECT"
-                        elif sql_upper.startswith("INSERT"):
-                            qtype = "INSERT"
-                        elif sql_upper.startswith("UPDATE"):
-                            qtype = "UPDATE"
-                        elif sql_upper.startswith("DELETE"):
-                            qtype = "DELETE"
-                        else:
-                            qtype = "UNKNOWN"
-                        query_types[qtype] = query_types.get(qtype, 0) + 1
-
-                        table = extract_table(sql)
-                        table_usage[table] = table_usage.get(table, 0) + 1
-
-        return jsonify(
-            {
-                "query_types": query_types,
-                "table_usage": table_usage,
-                "column_frequency": column_frequency,
-                "current_indexes": current_indexes,
-                "total_queries": sum(query_types.values()),
-            }
-        )
+                for kind, key, name, n, extra in rows:
+                    if kind == "freq":
+                        column_frequency.append(
+                            {"table": key, "column": name, "frequency": n, "percent": extra}
+                        )
+                    elif kind == "index":
+                        current_indexes.append({"name": name, "table": key, "sql": extra})
+                    elif kind == "qtype":
+                        query_types[key] = n
+                    elif kind == "table":
+                        table_usage[key] = n
+            except sqlite3.Error:
+                pass
+
+        payload = {
+            "query_types": query_types,
+            "table_usage": table_usage,
+            "column_frequency": column_frequency,
+            "current_indexes": current_indexes,
+            "total_queries": sum(query_types.values()),
+        }
+        body = dumps_json(payload)
+        etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+        _stats_cache.update(key=key, body=body, etag=etag, ts=time.time())
+        return _stats_response(body, etag)
     except Exception as e:
         error_msg = str(e)
         print(f"Error in api_statistics: {error_msg}")
@@ -344,15 +365,15 @@ def api_settings():
 
 
 if __name__ == '__main__':
-    # Start background threads
-    start_simulator_thread()          # ~1000 ticks/sec target
-    start_index_manager_thread()
-    start_focus_rotation_thread()
+    dev = os.environ.get('FLASK_ENV') == 'development'
+    # Start the background scheduler (under the reloader, only in the serving child)
+    if not dev or os.environ.get('WERKZEUG_RUN_MAIN'):
+        start_scheduler_thread()
 
     port = int(os.environ.get('PORT', 5000))
-    use_waitress = os.environ.get('USE_WAITRESS', '0') == '1'
-    if use_waitress:
-        from waitress import serve
-        serve(app, host='0.0.0.0', port=port)
-    else:
+    # dev server + reloader only when explicitly asked for
+    if dev:
         app.run(host='0.0.0.0', port=port, debug=True)
+    else:
+        from waitress import serve
+        serve(app, host='0.0.0.0', port=port, threads=8)
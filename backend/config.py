@@ -7,27 +7,55 @@ try:
 except Exception:
     psutil = None
 
+try:
+    import orjson  # optional, faster JSON file writes
+except Exception:
+    orjson = None
+
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 QUERY_LOG_DIR = BASE_DIR
 
 DB_PATH = os.path.join(QUERY_LOG_DIR, "auto_index.db")
-LOG_FILE = os.path.join(QUERY_LOG_DIR, "query_log.txt")
 STATUS_FILE = os.path.join(QUERY_LOG_DIR, "generator_status.txt")
 
 
+# Parsed JSON files keyed by path -> ((mtime_ns, size), data)
+_json_cache = {}
+
+
 def read_json(filename, default):
     path = os.path.join(DATA_DIR, filename)
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        hit = _json_cache.get(path)
+        if hit and hit[0] == stamp:
+            return hit[1]
+        with open(path, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson else json.loads(raw)
+        _json_cache[path] = (stamp, data)
+        return data
     except Exception:
         return default
 
 
-def write_json(filename, payload):
+def dumps_json(payload):
+    """Compact JSON bytes, via orjson when installed"""
+    if orjson:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+def write_json(filename, payload, data=None):
+    """Atomically replace a data file; pass data to reuse already-encoded bytes"""
     path = os.path.join(DATA_DIR, filename)
+    _json_cache.pop(path, None)
     os.makedirs(DATA_DIR, exist_ok=True)
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(payload, f, indent=2)
+    # write a temp file and swap it in so readers never see a partial file
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data if data is not None else dumps_json(payload))
+    os.replace(tmp, path)
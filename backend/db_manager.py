@@ -1,21 +1,90 @@
+import atexit
 import sqlite3
+import threading
 import time
 import os
+from collections import Counter, deque
 
 from backend.config import DB_PATH
-from backend.query_generator import extract_columns, extract_table
+from backend.query_generator import classify_query, extract_columns, extract_table
+from backend.space_saving import SpaceSaving
+
+
+_LOG_INSERT_SQL = "INSERT INTO query_log (id, ts, sql, qtype, table_name) VALUES (?, ?, ?, ?, ?)"
+
+
+def _is_busy(exc):
+    """True for the transient 'database is locked/busy' errors worth retrying"""
+    if not isinstance(exc, sqlite3.OperationalError):
+        return False
+    msg = str(exc).lower()
+    return "locked" in msg or "busy" in msg
 
 
 class DBManager:
     def __init__(self, db_path: str = DB_PATH):
         self.db_path = db_path
-        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10.0)
+        # the one writer connection: implicit transactions start as BEGIN IMMEDIATE,
+        # and _write_lock keeps threads (e.g. the atexit flush) from interleaving on it;
+        # API reads go through backend.db_pool's query_only connections
+        # the statement cache (keyed by SQL text) holds every generator template
+        # plus our own UPSERT/INSERT statements, so each is prepared only once
+        self._conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            timeout=10.0,
+            isolation_level="IMMEDIATE",
+            cached_statements=256,
+        )
+        self._write_lock = threading.Lock()
+        # page_size only takes effect on a fresh file, so it goes before anything is written
+        self._conn.execute("PRAGMA page_size=8192;")
         self._conn.execute("PRAGMA journal_mode=WAL;")
-        self._conn.execute("PRAGMA synchronous=OFF;")
+        # NORMAL is crash-safe under WAL, unlike OFF
+        self._conn.execute("PRAGMA synchronous=NORMAL;")
+        self._conn.execute("PRAGMA mmap_size=268435456;")  # 256 MB
+        self._conn.execute("PRAGMA cache_size=-65536;")  # 64 MB
+        self._conn.execute("PRAGMA temp_store=MEMORY;")
+        self._conn.execute("PRAGMA wal_autocheckpoint=1000;")
         self.init_schema()
         # Track recent query latencies
-        self.recent_latencies = []
         self.max_latency_history = 100
+        self.recent_latencies = deque(maxlen=self.max_latency_history)
+        self._latency_sum = 0.0
+        # get_database_size result and when it was taken
+        self._db_size = 0.0
+        self._db_size_at = float("-inf")
+        # Pending query_log rows, flushed in batches
+        self._log_buffer = []
+        self._log_buffer_since = 0.0
+        self.log_batch_size = 100
+        self.log_flush_sec = 1.0
+        # rows kept across failed flushes (e.g. while another writer holds the lock)
+        self.log_buffer_max = 10000
+        # generator writes, grouped by SQL and applied with executemany in one transaction
+        self._write_pending = {}
+        self._write_pending_count = 0
+        self._write_pending_since = 0.0
+        self.write_batch_size = 100
+        self.write_flush_sec = 0.1
+        # attribute_frequency increments, coalesced and applied in batches
+        self._freq_pending = Counter()
+        self._freq_pending_since = 0.0
+        self.freq_flush_sec = 0.2
+        atexit.register(self._flush_at_exit)
+        # in-memory column counts for auto_manage_indexes, seeded from the table
+        self.column_sketch = SpaceSaving(k=64)
+        for table_name, column_name, frequency in self._conn.execute(
+            "SELECT table_name, column_name, frequency FROM attribute_frequency"
+        ):
+            self.column_sketch.add((table_name, column_name), frequency)
+        # index names seen by auto_manage_indexes, and the schema_version they match
+        self._existing_indexes = None
+        self._schema_version = None
+        # ids are assigned here so callers know them before the batch is written
+        self._next_log_id = (
+            self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM query_log").fetchone()[0] + 1
+        )
 
     def init_schema(self):
         cur = self._conn.cursor()
@@ -41,6 +110,19 @@ class DBManager:
                 column_name TEXT,
                 frequency INTEGER
             );
+            CREATE TABLE IF NOT EXISTS query_log (
+                id INTEGER PRIMARY KEY,
+                ts TEXT,
+                sql TEXT,
+                qtype TEXT,
+                table_name TEXT
+            );
+            CREATE TABLE IF NOT EXISTS query_counters (
+                kind TEXT,
+                key TEXT,
+                n INTEGER,
+                PRIMARY KEY (kind, key)
+            );
             """
         )
         # Unique index for frequency table
@@ -50,130 +132,293 @@ class DBManager:
             ON attribute_frequency(table_name, column_name)
             """
         )
+        # lets auto_manage_indexes read its top/bottom rows without a sort
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_freq_freq ON attribute_frequency(frequency)"
+        )
+        # one-time backfill from a log written before query_counters existed
+        if cur.execute("SELECT 1 FROM query_counters LIMIT 1").fetchone() is None:
+            cur.execute(
+                """
+                INSERT INTO query_counters (kind, key, n)
+                SELECT 'qtype', qtype, COUNT(*) FROM query_log
+                WHERE qtype IS NOT NULL GROUP BY qtype
+                UNION ALL
+                SELECT 'table', table_name, COUNT(*) FROM query_log
+                WHERE table_name IS NOT NULL GROUP BY table_name
+                """
+            )
         self._conn.commit()
 
-    def execute(self, sql: str, params=None, retries: int = 3, delay: float = 0.05):
-        """Execute a query with basic retry on 'database is locked'. Returns (cursor, execution_time_ms)."""
+    def execute(self, sql: str, params=None):
+        """Execute and commit a query; locks are waited out by SQLite's busy handler (timeout). Returns (cursor, execution_time_ms)."""
         if params is None:
             params = ()
         start_time = time.perf_counter()
-        for attempt in range(retries):
+        with self._write_lock:
+            cur = self._conn.cursor()
+            cur.execute(sql, params)
+            # we always commit; this is a write-heavy simulator
+            self._conn.commit()
+        execution_time_ms = (time.perf_counter() - start_time) * 1000
+        # Track latency (only for successful queries), keeping a running sum
+        latencies = self.recent_latencies
+        if len(latencies) == latencies.maxlen:
+            self._latency_sum -= latencies[0]
+        latencies.append(execution_time_ms)
+        self._latency_sum += execution_time_ms
+        return cur, execution_time_ms
+
+    def queue_write(self, sql: str, params=()):
+        """Queue a write statement; queued writes are applied together by flush_writes"""
+        if not self._write_pending_count:
+            self._write_pending_since = time.time()
+        self._write_pending.setdefault(sql, []).append(params)
+        self._write_pending_count += 1
+        if (
+            self._write_pending_count >= self.write_batch_size
+            or time.time() - self._write_pending_since >= self.write_flush_sec
+        ):
             try:
-                cur = self._conn.cursor()
-                cur.execute(sql, params)
-                # we always commit; this is a write-heavy simulator
-                self._conn.commit()
-                # Calculate execution time
-                execution_time_ms = (time.perf_counter() - start_time) * 1000
-                # Track latency (only for successful queries)
-                self.recent_latencies.append(execution_time_ms)
-                if len(self.recent_latencies) > self.max_latency_history:
-                    self.recent_latencies.pop(0)
-                return cur, execution_time_ms
-            except sqlite3.OperationalError as e:
-                if "locked" in str(e).lower() and attempt < retries - 1:
-                    time.sleep(delay * (attempt + 1))
-                    continue
-                # If all retries failed, record the time but don't track latency
-                execution_time_ms = (time.perf_counter() - start_time) * 1000
-                raise
+                self.flush_writes()
+            except sqlite3.Error:
+                pass  # the writes stay queued and the next call retries them
+
+    def flush_writes(self):
+        """Apply the queued writes, one executemany per statement, in one transaction"""
+        if not self._write_pending_count:
+            return
+        pending, self._write_pending = self._write_pending, {}
+        self._write_pending_count = 0
+        conn = self._conn
+        with self._write_lock:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for sql, rows in pending.items():
+                    conn.execute("SAVEPOINT write_batch")
+                    try:
+                        conn.executemany(sql, rows)
+                    except sqlite3.Error:
+                        # one bad row (e.g. text for an INTEGER PRIMARY KEY) must not
+                        # cost the others: redo this statement's rows one at a time
+                        conn.execute("ROLLBACK TO write_batch")
+                        for row in rows:
+                            try:
+                                conn.execute(sql, row)
+                            except sqlite3.Error:
+                                pass
+                    conn.execute("RELEASE write_batch")
+                conn.commit()
             except Exception:
-                # For other exceptions, record time but don't track latency
-                execution_time_ms = (time.perf_counter() - start_time) * 1000
+                conn.rollback()
+                # put the batch back, ahead of anything queued meanwhile
+                for sql, rows in pending.items():
+                    self._write_pending.setdefault(sql, [])[:0] = rows
+                    self._write_pending_count += len(rows)
                 raise
 
     def get_average_latency(self):
         """Get average latency from recent queries in ms."""
         if not self.recent_latencies:
             return 0.0
-        return sum(self.recent_latencies) / len(self.recent_latencies)
+        return self._latency_sum / len(self.recent_latencies)
 
     def get_database_size(self):
-        """Get database file size in GB."""
-        try:
-            if os.path.exists(self.db_path):
-                size_bytes = os.path.getsize(self.db_path)
-                # Also check for WAL and SHM files
-                wal_path = self.db_path + '-wal'
-                shm_path = self.db_path + '-shm'
-                if os.path.exists(wal_path):
-                    size_bytes += os.path.getsize(wal_path)
-                if os.path.exists(shm_path):
-                    size_bytes += os.path.getsize(shm_path)
-                return size_bytes / (1024 ** 3)  # Convert to GB
-            return 0.0
-        except Exception:
-            return 0.0
+        """Get database file size (db + WAL + SHM) in GB, re-stat'd at most once a second."""
+        now = time.monotonic()
+        if now - self._db_size_at < 1.0:
+            return self._db_size
+        total = 0
+        for path in (self.db_path, self.db_path + '-wal', self.db_path + '-shm'):
+            try:
+                total += os.stat(path).st_size
+            except OSError:
+                pass
+        self._db_size = total / (1024 ** 3)  # Convert to GB
+        self._db_size_at = now
+        return self._db_size
 
-    def update_frequency_counter(self, sql: str):
-        """Update frequency counter for columns in SQL"""
-        table_name = extract_table(sql)
-        cols = extract_columns(sql)
+    def update_frequency_counter(self, sql: str, table_name=None, cols=None):
+        """Update frequency counter for columns in SQL (or the given table/columns)"""
+        if cols is None:
+            table_name = extract_table(sql)
+            cols = extract_columns(sql)
         if not cols or table_name == "unknown":
             return
 
-        cur = self._conn.cursor()
-
+        if not self._freq_pending:
+            self._freq_pending_since = time.time()
+        pending = self._freq_pending
+        add = self.column_sketch.add
         for col in cols:
-            cur.execute(
-                """
-                UPDATE attribute_frequency
-                SET frequency = frequency + 1
-                WHERE table_name = ? AND column_name = ?
-                """,
-                (table_name, col),
-            )
-            if cur.rowcount == 0:
-                cur.execute(
+            pending[(table_name, col)] += 1
+            add((table_name, col))
+        if time.time() - self._freq_pending_since >= self.freq_flush_sec:
+            try:
+                self.flush_frequency_counter()
+            except sqlite3.Error:
+                pass  # the increments stay pending and the next call retries them
+
+    def flush_frequency_counter(self):
+        """Apply the coalesced attribute_frequency increments in one transaction"""
+        if not self._freq_pending:
+            return
+        pending, self._freq_pending = self._freq_pending, Counter()
+        with self._write_lock:
+            try:
+                # one UPSERT per distinct column, all in a single executemany
+                self._conn.executemany(
                     """
                     INSERT INTO attribute_frequency (table_name, column_name, frequency)
-                    VALUES (?, ?, 1)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(table_name, column_name) DO UPDATE SET frequency = frequency + excluded.frequency
                     """,
-                    (table_name, col),
+                    [(table_name, col, n) for (table_name, col), n in pending.items()],
                 )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                # merge them back into whatever was counted meanwhile
+                self._freq_pending.update(pending)
+                raise
 
-        self._conn.commit()
+    def _flush_at_exit(self):
+        """Write whatever is still buffered when the process exits"""
+        try:
+            self.flush_writes()
+            self.flush_frequency_counter()
+            self.flush_query_log()
+        except Exception:
+            pass
 
-    def auto_manage_indexes(self):
-        """Auto index management based on attribute_frequency"""
-        cur = self._conn.cursor()
-        cur.execute(
-            """
-            SELECT table_name, column_name, frequency
-            FROM attribute_frequency
-            ORDER BY frequency DESC
+    def log_query(self, timestamp: str, sql: str, table_name=None):
+        """Queue a query_log row (written in batches) and return it as a dict"""
+        entry = {
+            "id": self._next_log_id,
+            "timestamp": timestamp,
+            "sql": sql,
+            "type": classify_query(sql),
+            "table": table_name if table_name is not None else extract_table(sql),
+        }
+        self._next_log_id += 1
+        if not self._log_buffer:
+            self._log_buffer_since = time.time()
+        self._log_buffer.append(
+            (entry["id"], timestamp, sql, entry["type"], entry["table"])
+        )
+        if (
+            len(self._log_buffer) >= self.log_batch_size
+            or time.time() - self._log_buffer_since >= self.log_flush_sec
+        ):
+            try:
+                self.flush_query_log()
+            except sqlite3.Error:
+                pass  # the rows stay buffered and the next call retries them
+        return entry
+
+    def flush_query_log(self):
+        """Write any queued query_log rows, and their query_counters bumps, in one transaction"""
+        if not self._log_buffer:
+            return
+        rows, self._log_buffer = self._log_buffer, []
+        with self._write_lock:
+            try:
+                self._conn.executemany(_LOG_INSERT_SQL, rows)
+                self._bump_query_counters(rows)
+                self._conn.commit()
+                return
+            except Exception as e:
+                self._conn.rollback()
+                if _is_busy(e):
+                    # their ids are already handed out: keep them for the next flush
+                    self._requeue_log_rows(rows)
+                    raise
+            # something in the batch can never insert (e.g. an id collision):
+            # write the rows one at a time and drop only the ones that fail
+            written = []
+            try:
+                for row in rows:
+                    try:
+                        self._conn.execute(_LOG_INSERT_SQL, row)
+                        written.append(row)
+                    except sqlite3.OperationalError as e:
+                        if _is_busy(e):
+                            raise
+                        print(f"Dropping query_log row {row[0]}: {e}")
+                    except sqlite3.Error as e:
+                        print(f"Dropping query_log row {row[0]}: {e}")
+                self._bump_query_counters(written)
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                self._requeue_log_rows(rows)
+                raise
+
+    def _bump_query_counters(self, rows):
+        """Add query_log rows to query_counters (in the caller's transaction)"""
+        counts = Counter()
+        for row in rows:
+            counts[("qtype", row[3])] += 1
+            counts[("table", row[4])] += 1
+        # one UPSERT per distinct query type / table
+        self._conn.executemany(
             """
+            INSERT INTO query_counters (kind, key, n) VALUES (?, ?, ?)
+            ON CONFLICT(kind, key) DO UPDATE SET n = n + excluded.n
+            """,
+            [(kind, key, n) for (kind, key), n in counts.items()],
         )
-        all_cols = cur.fetchall()
-        if len(all_cols) < 3:
+
+    def _requeue_log_rows(self, rows):
+        """Put rows back ahead of anything queued meanwhile, keeping the buffer bounded"""
+        buf = self._log_buffer
+        buf[:0] = rows
+        overflow = len(buf) - self.log_buffer_max
+        if overflow > 0:
+            print(f"query_log buffer full, dropping the {overflow} oldest rows")
+            del buf[:overflow]
+
+    def auto_manage_indexes(self):
+        """Auto index management based on the column usage counts"""
+        # the 3 most and 6 least used columns, straight from the in-memory sketch
+        top_three = [key for key, _ in self.column_sketch.topn(3)]
+        if len(top_three) < 3:
             return
+        bottom_six = [key for key, _ in self.column_sketch.bottomn(6)]
+
+        with self._write_lock:
+            cur = self._conn.cursor()
+            # index names are read once, then kept in step with our own CREATE/DROP;
+            # a schema_version we did not produce means someone else changed the schema
+            schema_version = cur.execute("PRAGMA schema_version").fetchone()[0]
+            if self._existing_indexes is None or schema_version != self._schema_version:
+                cur.execute(
+                    "SELECT name FROM sqlite_master WHERE type='index' AND name NOT LIKE 'sqlite_%';"
+                )
+                self._existing_indexes = {row[0] for row in cur.fetchall()}
+            existing_indexes = self._existing_indexes
 
-        top_three = all_cols[:3]
-        bottom_six = all_cols[-6:]
+            # Create indexes for top 3
+            for table_name, column_name in top_three:
+                index_name = f"idx_{table_name}_{column_name}"
+                if index_name not in existing_indexes:
+                    try:
+                        cur.execute(
+                            f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({column_name});"
+                        )
+                        existing_indexes.add(index_name)
+                    except Exception:
+                        pass
 
-        cur.execute(
-            "SELECT name FROM sqlite_master WHERE type='index' AND name NOT LIKE 'sqlite_%';"
-        )
-        existing_indexes = {row[0] for row in cur.fetchall()}
-
-        # Create indexes for top 3
-        for table_name, column_name, _ in top_three:
-            index_name = f"idx_{table_name}_{column_name}"
-            if index_name not in existing_indexes:
-                try:
-                    cur.execute(
-                        f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({column_name});"
-                    )
-                except Exception:
-                    pass
-
-        # Drop indexes for bottom 6
-        for table_name, column_name, _ in bottom_six:
-            index_name = f"idx_{table_name}_{column_name}"
-            if index_name in existing_indexes:
-                try:
-                    cur.execute(f"DROP INDEX IF EXISTS {index_name};")
-                except Exception:
-                    pass
+            # Drop indexes for bottom 6
+            for table_name, column_name in bottom_six:
+                index_name = f"idx_{table_name}_{column_name}"
+                if index_name in existing_indexes:
+                    try:
+                        cur.execute(f"DROP INDEX IF EXISTS {index_name};")
+                        existing_indexes.discard(index_name)
+                    except Exception:
+                        pass
 
-        self._conn.commit()
+            self._conn.commit()
+            self._schema_version = cur.execute("PRAGMA schema_version").fetchone()[0]
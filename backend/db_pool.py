@@ -0,0 +1,44 @@
+import queue
+import sqlite3
+from contextlib import contextmanager
+
+from backend.config import DB_PATH
+
+POOL_SIZE = 4
+
+_pool = queue.Queue(maxsize=POOL_SIZE)
+
+
+def _connect(db_path: str = DB_PATH):
+    conn = sqlite3.connect(
+        db_path,
+        check_same_thread=False,
+        isolation_level=None,
+        timeout=5.0,
+    )
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    conn.execute("PRAGMA mmap_size=268435456;")  # 256 MB
+    conn.execute("PRAGMA cache_size=-65536;")  # 64 MB
+    conn.execute("PRAGMA query_only=1;")
+    return conn
+
+
+@contextmanager
+def get_conn():
+    """Borrow a long-lived read-only connection, opening one if the pool is empty."""
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        conn = _connect()
+    try:
+        yield conn
+    finally:
+        # never hand back a connection still holding a read snapshot
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            _pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
@@ -0,0 +1,22 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson  # optional, C encoder for API responses
+except Exception:
+    orjson = None
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson when it is installed"""
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(
+            obj, default=self.default, option=orjson.OPT_NON_STR_KEYS
+        ).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
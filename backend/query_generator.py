@@ -1,15 +1,52 @@
 import random
 import re
-from datetime import datetime
+from functools import lru_cache
+from datetime import date
 
 # ------------------------ GAURAV'S QUERY GENERATOR ------------------------
 
 CUSTOMER_COLS = ["name", "email", "city", "join_date", "id"]
 ORDER_COLS = ["customer_id", "order_date", "amount", "status", "id"]
 
+# value pools and SQL text for generate(), built once
+_TABLES = ("customers", "orders")
+_CITIES = ("Delhi", "Mumbai", "Pune", "Kolkata")
+_STATUSES = ("Pending", "Shipped", "Delivered")
+_DELETE_VALUES = ("Delhi", "Mumbai", "Pending", "Delivered")
+_SELECT_CITIES = ("Delhi", "Pune", "Kolkata")
+_INSERT_SQL = {
+    "customers": "INSERT INTO customers (name, email, city, join_date) VALUES (?, ?, ?, ?)",
+    "orders": "INSERT INTO orders (customer_id, order_date, amount, status) VALUES (?, ?, ?, ?)",
+}
+_TABLE_COLS = (("customers", CUSTOMER_COLS), ("orders", ORDER_COLS))
+_UPDATE_SQL = {
+    (t, c): f"UPDATE {t} SET {c} = ? WHERE id = ?" for t, cols in _TABLE_COLS for c in cols
+}
+_DELETE_SQL = {(t, c): f"DELETE FROM {t} WHERE {c} = ?" for t, cols in _TABLE_COLS for c in cols}
+_SELECT_SQL = {
+    ("customers", c): f"SELECT * FROM customers WHERE {c} = ?" for c in CUSTOMER_COLS
+}
+_SELECT_SQL.update(
+    {("orders", c): f"SELECT * FROM orders WHERE {c} > ? ORDER BY order_date DESC" for c in ORDER_COLS}
+)
+
+# columns each statement touches, so callers need not re-parse the SQL
+_INSERT_COLS = {
+    "customers": ("name", "email", "city", "join_date"),
+    "orders": ("customer_id", "order_date", "amount", "status"),
+}
+_UPDATE_COLS = {(t, c): tuple(dict.fromkeys((c, "id"))) for t, cols in _TABLE_COLS for c in cols}
+_FOCUS_COLS = {(t, c): (c,) for t, cols in _TABLE_COLS for c in cols}
+_SELECT_COLS = {("customers", c): (c,) for c in CUSTOMER_COLS}
+_SELECT_COLS.update({("orders", c): tuple(dict.fromkeys((c, "order_date"))) for c in ORDER_COLS})
+
 
 class QueryGenerator:
     def __init__(self):
+        # Private RNG with its methods bound once
+        self._rng = random.Random()
+        self._choice = self._rng.choice
+        self._random = self._rng.random
         self.customer_cycle = CUSTOMER_COLS.copy()
         self.order_cycle = ORDER_COLS.copy()
         self.current_focus = {
@@ -26,61 +63,54 @@ class QueryGenerator:
         self.current_focus["orders"]["most"] = self.order_cycle[0]
         self.current_focus["orders"]["least"] = self.order_cycle[-1]
 
-    def generate(self):
-        """Generate queries using Gaurav's logic"""
-        qtype = random.random()
-        table = random.choice(["customers", "orders"])
-        focus_col = (
-            self.current_focus[table]["most"]
-            if random.random() < 0.7
-            else self.current_focus[table]["least"]
-        )
+    def generate(self, today=None):
+        """Generate queries using Gaurav's logic; returns (sql, params, table, columns)"""
+        rand = self._random
+        choice = self._choice
+        qtype = rand()
+        table = choice(_TABLES)
+        focus = self.current_focus[table]
+        focus_col = focus["most"] if rand() < 0.7 else focus["least"]
 
         if qtype <= 0.25:
             # INSERT
+            if today is None:
+                today = date.today().isoformat()
             if table == "customers":
-                values = (
-                    f"User{random.randint(1, 10000)}",
-                    f"user{random.randint(1, 10000)}@mail.com",
-                    random.choice(["Delhi", "Mumbai", "Pune", "Kolkata"]),
-                    datetime.now().strftime("%Y-%m-%d"),
+                params = (
+                    f"User{1 + int(rand() * 10000)}",
+                    f"user{1 + int(rand() * 10000)}@mail.com",
+                    choice(_CITIES),
+                    today,
                 )
-                sql = "INSERT INTO customers (name, email, city, join_date) VALUES (?, ?, ?, ?)"
-                params = values
             else:
-                values = (
-                    random.randint(1, 50),
-                    datetime.now().strftime("%Y-%m-%d"),
-                    round(random.uniform(500, 10000), 2),
-                    random.choice(["Pending", "Shipped", "Delivered"]),
+                params = (
+                    1 + int(rand() * 50),
+                    today,
+                    round(500 + 9500 * rand(), 2),
+                    choice(_STATUSES),
                 )
-                sql = "INSERT INTO orders (customer_id, order_date, amount, status) VALUES (?, ?, ?, ?)"
-                params = values
-            return sql, params
+            return _INSERT_SQL[table], params, table, _INSERT_COLS[table]
 
         elif qtype <= 0.45:
             # UPDATE
-            value = f"Update{random.randint(100, 999)}"
-            sql = f"UPDATE {table} SET {focus_col} = ? WHERE id = ?"
-            params = (value, random.randint(1, 50))
-            return sql, params
+            key = (table, focus_col)
+            params = (f"Update{100 + int(rand() * 900)}", 1 + int(rand() * 50))
+            return _UPDATE_SQL[key], params, table, _UPDATE_COLS[key]
 
         elif qtype >= 0.95:
             # DELETE
-            value = random.choice(["Delhi", "Mumbai", "Pending", "Delivered"])
-            sql = f"DELETE FROM {table} WHERE {focus_col} = ?"
-            params = (value,)
-            return sql, params
+            key = (table, focus_col)
+            return _DELETE_SQL[key], (choice(_DELETE_VALUES),), table, _FOCUS_COLS[key]
 
         else:
             # SELECT
             if table == "customers":
-                sql = f"SELECT * FROM customers WHERE {focus_col} = ?"
-                params = (random.choice(["Delhi", "Pune", "Kolkata"]),)
+                params = (choice(_SELECT_CITIES),)
             else:
-                sql = f"SELECT * FROM orders WHERE {focus_col} > ? ORDER BY order_date DESC"
-                params = (random.randint(1000, 8000),)
-            return sql, params
+                params = (1000 + int(rand() * 7001),)
+            key = (table, focus_col)
+            return _SELECT_SQL[key], params, table, _SELECT_COLS[key]
 
     @staticmethod
     def format_sql(sql, params):
@@ -111,73 +141,64 @@ TABLE_PATTERN = re.compile(
     re.IGNORECASE,
 )
 
-KEYWORDS = {
+# every supported verb is six characters, so the first six chars are the key
+QUERY_TYPES = {
+    "SELECT": "SELECT",
+    "INSERT": "INSERT",
+    "UPDATE": "UPDATE",
+    "DELETE": "DELETE",
+}
+
+# extract_columns clause patterns, compiled once (case-insensitive, so no upper() copy)
+_INSERT_RE = re.compile(r"INSERT\s+INTO\s+\w+\s*\((.*?)\)", re.IGNORECASE)
+_UPDATE_RE = re.compile(r"UPDATE\s+\w+\s+SET\s+(.*?)(?:\s+WHERE|$)", re.IGNORECASE)
+_SELECT_RE = re.compile(r"SELECT\s+(.*?)\s+FROM", re.IGNORECASE)
+_WHERE_RE = re.compile(r"WHERE\s+(.*?)(?:\s+ORDER|\s+GROUP|\s+LIMIT|$)", re.IGNORECASE)
+_ORDER_RE = re.compile(r"ORDER\s+BY\s+(.*?)(?:\s+DESC|\s+ASC|\s+LIMIT|$)", re.IGNORECASE)
+# one pass per clause: quoted literals (skipped) and possibly qualified identifiers
+_TOKEN_RE = re.compile(r"'[^']*'|\"[^\"]*\"|[A-Za-z_][\w.]*")
+
+KEYWORDS = frozenset({
     "SELECT", "FROM", "WHERE", "AND", "OR", "AS", "ON", "IN",
     "VALUES", "SET", "BY", "GROUP", "ORDER", "COUNT", "SUM",
     "AVG", "MAX", "MIN", "DESC", "ASC",
-}
+})
+# tokens are lowercased for the result anyway, so compare them lowercased
+_KEYWORDS_LOWER = frozenset(k.lower() for k in KEYWORDS)
+
 
+def _clause_columns(clause, cols):
+    """Append the column names referenced in one clause to cols"""
+    for tok in _TOKEN_RE.findall(clause):
+        if tok[0] in "'\"":
+            continue
+        col = tok.rpartition(".")[2].lower()  # table.column -> column
+        if col and col not in _KEYWORDS_LOWER:
+            cols.append(col)
 
+
+@lru_cache(maxsize=512)
 def extract_columns(sql: str):
-    """Extract column names from SQL"""
+    """Extract column names from SQL (cached; the generator repeats a few templates)"""
     cols = []
-    sql_upper = sql.upper()
-
-    # INSERT INTO table (col1, col2, ...) VALUES
-    insert_match = re.search(r"INSERT\s+INTO\s+\w+\s*\((.*?)\)", sql_upper, re.IGNORECASE)
-    if insert_match:
-        col_list = insert_match.group(1)
-        for col in re.split(r"[,\s]+", col_list):
-            col = col.strip()
-            if col and col.upper() not in KEYWORDS:
-                cols.append(col.lower())
-
-    # UPDATE table SET col1 = ..., col2 = ...
-    update_match = re.search(r"UPDATE\s+\w+\s+SET\s+(.*?)(?:\s+WHERE|$)", sql_upper, re.IGNORECASE)
-    if update_match:
-        set_clause = update_match.group(1)
-        for col in re.split(r"[,\s=]+", set_clause):
-            col = col.strip()
-            if col and col.upper() not in KEYWORDS:
-                cols.append(col.lower())
-
-    # SELECT col1, col2 FROM or SELECT * FROM
-    select_match = re.search(r"SELECT\s+(.*?)\s+FROM", sql_upper, re.IGNORECASE)
-    if select_match:
-        select_list = select_match.group(1)
-        if select_list.strip() != "*":
-            for col in re.split(r"[,\s]+", select_list):
-                col = col.strip().split(".")[-1]  # Handle table.column
-                col = re.sub(r"\(.*?\)", "", col)  # Remove function calls
-                if col and col.upper() not in KEYWORDS:
-                    cols.append(col.lower())
-
-    # WHERE clause
-    where_match = re.search(r"WHERE\s+(.*?)(?:\s+ORDER|\s+GROUP|\s+LIMIT|$)", sql_upper, re.IGNORECASE)
-    if where_match:
-        where_clause = where_match.group(1)
-        for col in re.split(r"[,\s=<>!]+", where_clause):
-            col = col.strip().split(".")[-1]
-            if col and col.upper() not in KEYWORDS:
-                cols.append(col.lower())
-
-    # ORDER BY
-    order_match = re.search(r"ORDER\s+BY\s+(.*?)(?:\s+DESC|\s+ASC|\s+LIMIT|$)", sql_upper, re.IGNORECASE)
-    if order_match:
-        order_list = order_match.group(1)
-        for col in re.split(r"[,\s]+", order_list):
-            col = col.strip().split(".")[-1]
-            if col and col.upper() not in KEYWORDS:
-                cols.append(col.lower())
-
-    # Dedup + filter
-    cols = list(set([c for c in cols if c and not c.isdigit()]))
-    return cols
+    for clause_re in (_INSERT_RE, _UPDATE_RE, _SELECT_RE, _WHERE_RE, _ORDER_RE):
+        match = clause_re.search(sql)
+        if match:
+            _clause_columns(match.group(1), cols)
+
+    # Dedup (first-seen order); a tuple, since cached results are shared
+    return tuple(dict.fromkeys(cols))
 
 
+@lru_cache(maxsize=512)
 def extract_table(sql: str):
-    """Extract table name from SQL"""
+    """Extract table name from SQL (cached; log readers see the same lines repeatedly)"""
     match = TABLE_PATTERN.search(sql)
     if match:
         return match.group(1).lower()
     return "unknown"
+
+
+def classify_query(sql: str):
+    """Classify SQL by its leading verb"""
+    return QUERY_TYPES.get(sql[:6].upper(), "UNKNOWN")
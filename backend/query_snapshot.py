@@ -0,0 +1,96 @@
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+
+def _entry_id(entry):
+    return entry["id"]
+
+
+class QuerySnapshot:
+    """In-memory window of recently logged queries that /api/queries pages from without the DB"""
+
+    def __init__(self, size: int = 10000, max_searches: int = 32):
+        self.lock = threading.Lock()
+        self.size = size
+        self.max_searches = max_searches
+        # oldest first, ids ascending
+        self.entries = []
+        # search term -> matches kept up to date incrementally (LRU)
+        self._views = OrderedDict()
+
+    def append(self, entry: dict):
+        """Add a logged query (dict with id, timestamp, sql, type, table)"""
+        with self.lock:
+            self.entries.append(entry)
+            if len(self.entries) > 2 * self.size:
+                del self.entries[:-self.size]
+
+    def _install_view(self, term, base_id, older):
+        """Start (or restart) term's view at base_id, with older matches already counted"""
+        view = {"matches": [], "seen": base_id - 1, "older": older, "count": 0}
+        self._views[term] = view
+        if len(self._views) > self.max_searches:
+            self._views.popitem(last=False)
+        return view
+
+    def _search_view(self, term, view):
+        """Bring term's view up to date with the window; returns (matches, total)"""
+        self._views.move_to_end(term)
+        # only scan what was logged since the view was last used
+        needle = term.lower()
+        i = bisect_right(self.entries, view["seen"], key=_entry_id)
+        for entry in self.entries[i:]:
+            if needle in entry["sql"].lower():
+                view["matches"].append(entry)
+                view["count"] += 1
+        if len(view["matches"]) > 2 * self.size:
+            del view["matches"][:-self.size]
+        view["seen"] = self.entries[-1]["id"]
+        return view["matches"], view["older"] + view["count"]
+
+    def _stale(self, view):
+        # entries it has not scanned yet were already trimmed
+        return view is None or view["seen"] + 1 < self.entries[0]["id"]
+
+    @staticmethod
+    def _slice(rows, total, start, page_size, before_id):
+        if before_id is not None:
+            end = bisect_left(rows, before_id, key=_entry_id)
+        else:
+            end = len(rows) - start
+        # older rows than the window holds: let the caller hit the DB
+        if end < page_size and total > len(rows):
+            return None
+        end = max(0, end)
+        items = [dict(e) for e in reversed(rows[max(0, end - page_size):end])]
+        return items, total
+
+    def page(self, search, start, page_size, before_id=None, count_older=None):
+        """Return (items newest first, total), or None when the window can't serve the page"""
+        with self.lock:
+            if not self.entries:
+                return None
+            if not search:
+                return self._slice(
+                    self.entries, self.entries[-1]["id"], start, page_size, before_id
+                )
+            if count_older is None:
+                return None
+            view = self._views.get(search)
+            if not self._stale(view):
+                return self._slice(*self._search_view(search, view), start, page_size, before_id)
+            base_id = self.entries[0]["id"]
+
+        # a new search (or one the window trimmed past): count the matches the
+        # window no longer holds without the lock, so append() never waits on the DB
+        older = count_older(search, base_id)
+
+        with self.lock:
+            view = self._views.get(search)
+            if view is None or view["seen"] + 1 < base_id:
+                view = self._install_view(search, base_id, older)
+            if self._stale(view):
+                # trimmed again while we were counting; let the DB serve this one
+                return None
+            return self._slice(*self._search_view(search, view), start, page_size, before_id)
@@ -1,3 +1,5 @@
+import heapq
+import mmap
 import threading
 import time
 import random
@@ -5,13 +7,15 @@ import os
 from collections import deque
 from datetime import datetime, timezone
 
-from backend.config import psutil, write_json, DB_PATH, LOG_FILE, STATUS_FILE
+from backend.config import psutil, dumps_json, write_json, DB_PATH, STATUS_FILE
 from backend.db_manager import DBManager
 from backend.query_generator import QueryGenerator
+from backend.query_snapshot import QuerySnapshot
 
 
 class MetricsSimulator:
-    def __init__(self, db_manager: DBManager, query_generator: QueryGenerator, window: int = 60):
+    def __init__(self, db_manager: DBManager, query_generator: QueryGenerator,
+                 query_snapshot: QuerySnapshot = None, window: int = 60):
         self.lock = threading.Lock()
         self.window = window
         self.labels = deque(maxlen=self.window)
@@ -23,19 +27,30 @@ class MetricsSimulator:
         
         self.db_manager = db_manager
         self.query_generator = query_generator
+        self.query_snapshot = query_snapshot
         
+        # System CPU/memory percentages, refreshed by the psutil sampler thread
+        self._cpu_cache = None
+        self._mem_cache = None
+
+        # (epoch second, log timestamp, date, chart label) strings reused within a second
+        self._clock_strs = (None, "", "", "")
+
+        # generator_status.txt, memory-mapped and overwritten in place once a second
+        self._status_mm = None
+        self._status_sec = None
+
+        # epoch second metrics.json was last rewritten in; /api/metrics encodes
+        # the live series itself, so the file only needs refreshing once a second
+        self._metrics_sec = None
+        self._tick_count = 0
+        # (tick count, encoded payload) served by /api/metrics until the next tick
+        self._metrics_json = (0, b"")
+
         # Track query count for QPS calculation
         self.query_count = 0
         self.last_qps_time = time.time()
         self.query_times = deque(maxlen=100)  # Track last 100 query timestamps
-        
-        # Get current process for CPU/Memory tracking
-        self.current_process = None
-        if psutil:
-            try:
-                self.current_process = psutil.Process(os.getpid())
-            except Exception:
-                pass
 
         self._seed()
 
@@ -43,176 +58,226 @@ class MetricsSimulator:
         """Initialize with current database metrics"""
         db_size = self.db_manager.get_database_size()
         avg_latency = self.db_manager.get_average_latency() or 10.0
-        
-        for i in range(self.window):
-            self.labels.append(f"t-{self.window - i}")
-            self.qps.append(0)  # Will be calculated from actual queries
-            self.latency.append(avg_latency)
-            
-            # Get process CPU/Memory if available
-            if self.current_process:
-                try:
-                    cpu_val = self.current_process.cpu_percent(interval=0.1) or 0
-                    mem_info = self.current_process.memory_info()
-                    mem_val = (mem_info.rss / (1024 ** 3)) * 100  # Convert to GB then percentage (rough estimate)
-                except Exception:
-                    cpu_val = 0
-                    mem_val = 0
-            else:
-                cpu_val = 0
-                mem_val = 0
-            
-            self.cpu.append(max(0, min(100, cpu_val)))
-            self.mem.append(max(0, min(100, mem_val)))
-            self.storage.append(db_size)
+
+        # One non-blocking system sample fills the whole window, on the same
+        # scale as the sampler thread's readings that tick() appends later
+        self.sample_system()
+        cpu_val = self._cpu_cache or 0
+        mem_val = self._mem_cache or 0
+        cpu_val = max(0, min(100, cpu_val))
+        mem_val = max(0, min(100, mem_val))
+
+        self.labels.extend(f"t-{self.window - i}" for i in range(self.window))
+        self.qps.extend([0] * self.window)  # Will be calculated from actual queries
+        self.latency.extend([avg_latency] * self.window)
+        self.cpu.extend([cpu_val] * self.window)
+        self.mem.extend([mem_val] * self.window)
+        self.storage.extend([db_size] * self.window)
 
     def tick(self):
-        with self.lock:
-            now_utc = datetime.now(timezone.utc)
-            current_time = time.time()
-            
-            # query generation & execution
-            query_executed = False
-            query_latency = 0.0
-            
-            try:
-                sql, params = self.query_generator.generate()
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # one clock read per tick, shared by the label, log timestamp and metrics
+        now_utc = datetime.now(timezone.utc)
+        current_time = now_utc.timestamp()
+        # strftime only when the second changes; many ticks share each second
+        sec = int(current_time)
+        if self._clock_strs[0] != sec:
+            stamp = now_utc.astimezone().strftime("%Y-%m-%d %H:%M:%S")
+            self._clock_strs = (sec, stamp, stamp[:10], now_utc.strftime('%H:%M:%S'))
+        _, timestamp, today, label = self._clock_strs
+        
+        # query generation & execution
+        query_executed = False
+        query_latency = 0.0
+        
+        try:
+            sql, params, table, cols = self.query_generator.generate(today)
 
-                # Execute in DB and get actual execution time
-                try:
+            # Reads run now (and give the latency); writes are queued and
+            # applied in batches, one transaction per flush
+            try:
+                if sql.startswith("SELECT"):
                     result, exec_time_ms = self.db_manager.execute(sql, params or ())
-                    query_executed = True
                     query_latency = exec_time_ms
-                    
-                    # Track query time for QPS calculation
-                    self.query_times.append(current_time)
-                    self.query_count += 1
-                except Exception:
-                    pass
-
-                # Format SQL for logging & frequency
-                formatted_sql = self.query_generator.format_sql(sql, params)
-                try:
-                    self.db_manager.update_frequency_counter(formatted_sql)
-                except Exception:
-                    pass
-
-                # Write log
-                log_entry = f"{timestamp} | {formatted_sql} | {params}\n"
-                with open(LOG_FILE, "a", encoding="utf-8") as f:
-                    f.write(log_entry)
-
-                # Update status file
-                with open(STATUS_FILE, "w") as f:
-                    f.write(str(current_time))
+                else:
+                    self.db_manager.queue_write(sql, params or ())
+                query_executed = True
+
+                # Track query time for QPS calculation
+                self.query_times.append(current_time)
+                self.query_count += 1
+            except Exception:
+                pass
+
+            # Format SQL for logging & frequency
+            formatted_sql = self.query_generator.format_sql(sql, params)
+            try:
+                # the generator already knows the columns; no need to re-parse
+                self.db_manager.update_frequency_counter(formatted_sql, table, cols)
+            except Exception:
+                pass
 
+            # Write log
+            try:
+                entry = self.db_manager.log_query(timestamp, formatted_sql, table)
+                if self.query_snapshot is not None:
+                    self.query_snapshot.append(entry)
             except Exception:
                 pass
 
-            # Calculate QPS from recent queries (last second)
-            time_window = 1.0  # 1 second window
-            recent_queries = [t for t in self.query_times if current_time - t <= time_window]
-            qps_val = len(recent_queries)
-            
-            # Get actual latency from database manager
-            avg_latency = self.db_manager.get_average_latency()
-            if avg_latency > 0:
-                lat_val = avg_latency
-            elif query_latency > 0:
-                lat_val = query_latency
-            else:
-                # Fallback to last known latency
-                lat_val = self.latency[-1] if self.latency else 10.0
-
-            # Get system-wide CPU and Memory usage (not just process)
-            if psutil:
-                try:
-                    # CPU: system-wide CPU usage percentage
-                    cpu_val = psutil.cpu_percent(interval=0.1) or 0
-                    # Memory: system-wide memory usage percentage
-                    system_mem = psutil.virtual_memory()
-                    mem_val = system_mem.percent
-                except Exception:
-                    cpu_val = self.cpu[-1] if self.cpu else 0
-                    mem_val = self.mem[-1] if self.mem else 0
-            else:
-                cpu_val = self.cpu[-1] if self.cpu else 0
-                mem_val = self.mem[-1] if self.mem else 0
-
-            # Get actual database file size
-            db_size = self.db_manager.get_database_size()
-            stor_val = db_size if db_size > 0 else (self.storage[-1] if self.storage else 0.0)
-
-            # Update metrics
-            self.labels.append(now_utc.strftime('%H:%M:%S'))
+            # Update status file
+            self._touch_status(current_time)
+
+        except Exception:
+            pass
+
+        # Calculate QPS from recent queries (last second); timestamps arrive in
+        # order, so expired ones are dropped from the left instead of rescanned
+        time_window = 1.0  # 1 second window
+        query_times = self.query_times
+        while query_times and current_time - query_times[0] > time_window:
+            query_times.popleft()
+        qps_val = len(query_times)
+        
+        # Get actual latency from database manager
+        avg_latency = self.db_manager.get_average_latency()
+        if avg_latency > 0:
+            lat_val = avg_latency
+        elif query_latency > 0:
+            lat_val = query_latency
+        else:
+            # Fallback to last known latency
+            lat_val = self.latency[-1] if self.latency else 10.0
+
+        # System-wide CPU and Memory usage as last sampled by the sampler thread
+        if self._cpu_cache is not None:
+            cpu_val = self._cpu_cache
+            mem_val = self._mem_cache
+        else:
+            cpu_val = self.cpu[-1] if self.cpu else 0
+            mem_val = self.mem[-1] if self.mem else 0
+
+        # Get actual database file size
+        db_size = self.db_manager.get_database_size()
+        stor_val = db_size if db_size > 0 else (self.storage[-1] if self.storage else 0.0)
+
+        # Update metrics; the lock only covers the deque mutations and snapshot
+        with self.lock:
+            self.labels.append(label)
             self.qps.append(round(qps_val, 2))
             self.latency.append(round(lat_val, 2))
             self.cpu.append(round(max(0, min(100, cpu_val)), 2))
             self.mem.append(round(max(0, min(100, mem_val)), 2))
             self.storage.append(round(stor_val, 4))  # More precision for storage
 
-            # write metrics.json
-            write_json(
-                'metrics.json',
-                {
-                    "timestamp": now_utc.isoformat(),
-                    "series": {
-                        "labels": list(self.labels),
-                        "qps": list(self.qps),
-                        "latencyMs": list(self.latency),
-                        "cpu": list(self.cpu),
-                        "memory": list(self.mem),
-                        "storageGb": list(self.storage),
-                    },
-                },
-            )
+            self._tick_count += 1
+            tick_count = self._tick_count
+            if sec == self._metrics_sec:
+                return
+            self._metrics_sec = sec
+            payload = self._metrics_payload(now_utc)
 
+        # write metrics.json (throttled; the deques stay authoritative),
+        # encoding once for both the file and /api/metrics
+        data = dumps_json(payload)
+        self._metrics_json = (tick_count, data)
+        write_json('metrics.json', payload, data)
 
-# Singletons
-db_manager = DBManager(DB_PATH)
-query_generator = QueryGenerator()
-simulator = MetricsSimulator(db_manager, query_generator)
+    def _touch_status(self, ts):
+        """Write the heartbeat timestamp without reopening the status file"""
+        # readers allow a 10s timeout; per-tick writes would only add syscalls
+        sec = int(ts)
+        if sec == self._status_sec:
+            return
+        self._status_sec = sec
+        data = b"%.6f" % ts
+        if self._status_mm is None:
+            fd = os.open(STATUS_FILE, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                # fixed width, so each write fully covers the previous one
+                os.ftruncate(fd, len(data))
+                self._status_mm = mmap.mmap(fd, len(data))
+            finally:
+                os.close(fd)
+        self._status_mm[:len(data)] = data
 
+    def sample_system(self):
+        """Refresh the cached system CPU and memory percentages"""
+        if not psutil:
+            return
+        try:
+            # CPU: average since the previous sample
+            cpu_val = psutil.cpu_percent(interval=None) or 0
+            mem_val = psutil.virtual_memory().percent
+        except Exception:
+            return
+        self._cpu_cache = cpu_val
+        self._mem_cache = mem_val
 
-def start_simulator_thread(interval_sec: float = 0.001):
-    """Run tick loop; 0.001s ≈ 1000 ticks/sec (subject to reality)."""
-    def _loop():
-        while True:
-            try:
-                time.sleep(0.0005)
-                simulator.tick()
-            except Exception:
-                pass
-            time.sleep(interval_sec)
+    def _metrics_payload(self, now_utc):
+        return {
+            "timestamp": now_utc.isoformat(),
+            "series": {
+                "labels": list(self.labels),
+                "qps": list(self.qps),
+                "latencyMs": list(self.latency),
+                "cpu": list(self.cpu),
+                "memory": list(self.mem),
+                "storageGb": list(self.storage),
+            },
+        }
 
-    thr = threading.Thread(target=_loop, daemon=True)
-    thr.start()
+    def snapshot_metrics_json(self):
+        """Encoded metrics payload (encoded at most once per tick), or None before the first tick"""
+        with self.lock:
+            tick_count = self._tick_count
+            if not tick_count:
+                return None
+            cached = self._metrics_json
+            if cached[0] == tick_count:
+                return cached[1]
+            payload = self._metrics_payload(datetime.now(timezone.utc))
+        data = dumps_json(payload)
+        self._metrics_json = (tick_count, data)
+        return data
 
 
-def start_index_manager_thread():
-    """Auto-manage indexes every 10 seconds."""
-    def _loop():
-        while True:
-            try:
-                time.sleep(10)
-                db_manager.auto_manage_indexes()
-            except Exception:
-                pass
+# Singletons
+db_manager = DBManager(DB_PATH)
+query_generator = QueryGenerator()
+query_snapshot = QuerySnapshot()
+simulator = MetricsSimulator(db_manager, query_generator, query_snapshot)
 
-    thr = threading.Thread(target=_loop, daemon=True)
-    thr.start()
 
+def start_scheduler_thread(tick_interval_sec: float = 0.001):
+    """Run the tick loop, psutil sampler, index manager and focus rotation on one thread."""
+    # (first delay, interval, callback); the tick period is the interval alone (1ms)
+    jobs = [
+        (0.0, tick_interval_sec, simulator.tick),
+        (10.0, 10.0, db_manager.auto_manage_indexes),
+        (6.0, 6.0, query_generator.rotate_focus_once),
+    ]
+    if psutil:
+        jobs.append((0.0, 1.0, simulator.sample_system))
+
+    now = time.monotonic()
+    # min-heap of (next fire, seq, interval, callback); seq breaks ties
+    heap = [(now + delay, seq, interval, cb) for seq, (delay, interval, cb) in enumerate(jobs)]
+    heapq.heapify(heap)
 
-def start_focus_rotation_thread():
-    """Rotate column focus every 6 seconds."""
     def _loop():
         while True:
+            when, seq, interval, cb = heap[0]
+            delay = when - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+                continue
             try:
-                time.sleep(6)
-                query_generator.rotate_focus_once()
+                cb()
             except Exception:
                 pass
+            # fixed rate, so a job's run time doesn't stretch its period; a job
+            # that fell behind runs again at once instead of bursting to catch up
+            heapq.heapreplace(heap, (max(when + interval, time.monotonic()), seq, interval, cb))
 
     thr = threading.Thread(target=_loop, daemon=True)
     thr.start()
@@ -0,0 +1,29 @@
+import heapq
+from operator import itemgetter
+
+
+class SpaceSaving:
+    """Top-k frequency sketch (Metwally et al.); exact while at most k distinct keys are seen"""
+
+    def __init__(self, k: int = 64):
+        self.k = k
+        self.counts = {}
+
+    def add(self, key, n: int = 1):
+        counts = self.counts
+        if key in counts:
+            counts[key] += n
+        elif len(counts) < self.k:
+            counts[key] = n
+        else:
+            # evict the smallest counter; the newcomer inherits its count
+            victim = min(counts, key=counts.get)
+            counts[key] = counts.pop(victim) + n
+
+    def topn(self, n: int):
+        """The n most frequent (key, count) pairs, highest first"""
+        return heapq.nlargest(n, self.counts.items(), key=itemgetter(1))
+
+    def bottomn(self, n: int):
+        """The n least frequent (key, count) pairs, lowest first"""
+        return heapq.nsmallest(n, self.counts.items(), key=itemgetter(1))
@@ -50,7 +50,6 @@ if errorlevel 1 (
 
 :: Set Flask port
 set PORT=5000
-set USE_WAITRESS=1
 
 :: Start Flask app in new window
 echo [4/4] Starting Flask app...
@@ -44,7 +44,6 @@ pip install -r requirements.txt >/dev/null 2>&1 ||
 
 # ---------- Export env vars ----------
 export PORT=5000
-export USE_WAITRESS=1
 
 # ---------- Start Flask app ----------
 echo "[4/4] Starting Flask app..."
@@ -89,11 +89,18 @@ window.IndexUI = (function () {
 		const tbody = document.getElementById('queriesTbody');
 		const form = document.getElementById('querySearchForm');
 		const pagination = document.getElementById('pagination');
+		const maxPages = 50;
 		let page = 1;
+		// page -> before_id cursor learned from the previous page's response
+		let cursors = {};
+		let cursorKey = '';
 		async function load() {
 			const search = document.getElementById('querySearch').value;
 			const pageSize = document.getElementById('pageSize').value;
-			const data = await fetchJson(`${api.queries}?page=${page}&pageSize=${pageSize}&search=${encodeURIComponent(search)}`);
+			if (`${search}|${pageSize}` !== cursorKey) { cursors = {}; cursorKey = `${search}|${pageSize}`; }
+			const cursor = page > 1 && cursors[page] ? `&before_id=${cursors[page]}` : '';
+			const data = await fetchJson(`${api.queries}?page=${page}&pageSize=${pageSize}&search=${encodeURIComponent(search)}${cursor}`);
+			if (data.nextBeforeId) cursors[data.page + 1] = data.nextBeforeId;
 			tbody.innerHTML = data.items.map(q => `
 				<tr>
 					<td>${q.timestamp}</td>
@@ -102,7 +109,8 @@ window.IndexUI = (function () {
 					<td><code style="white-space: pre-line">${q.sql}</code></td>
 				</tr>
 			`).join('');
-			const pages = Math.max(1, Math.ceil(data.total / data.pageSize));
+			// total may be an estimate over the whole log; cap the links rendered
+			const pages = Math.min(maxPages, Math.max(1, Math.ceil(data.total / data.pageSize)));
 			pagination.innerHTML = Array.from({ length: pages }, (_, i) => i + 1).map(i => `
 				<li><a href="#" data-page="${i}" ${i===data.page?'class="primary"':''}>${i}</a></li>
 			`).join('');